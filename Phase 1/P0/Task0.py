@@ -2,14 +2,9 @@
 Read file into texts and calls.
 It's ok if you don't understand how to read files.
 """
-import csv
-with open('texts.csv', 'r') as f:
-    reader = csv.reader(f)
-    texts = list(reader)
+import cdr
 
-with open('calls.csv', 'r') as f:
-    reader = csv.reader(f)
-    calls = list(reader)
+table = cdr.load()
 
 # Worst case Big-O: 1
 
@@ -22,8 +17,8 @@ Print messages:
 "Last record of calls, <incoming number> calls <answering number> at time <time>, lasting <during> seconds"
 """
 
-firstText = texts[0]
+firstText = table.textRecord(0)
 print(f'First record of texts, {firstText[0]} texts {firstText[1]} at time {firstText[2]}')
 
-lastCall = calls[len(calls)-1]
+lastCall = table.callRecord(table.callCount()-1)
 print(f'Last record of calls, {lastCall[0]} calls {lastCall[1]} at time {lastCall[2]}, lasting {lastCall[3]} seconds')
@@ -1,39 +1,43 @@
 """
 Read file into texts and calls.
 It's ok if you don't understand how to read files.
+
+Run with --approx to also print a HyperLogLog estimate, counted by
+streaming the csv files, and --error to set its standard error.
 """
-import csv
-with open('texts.csv', 'r') as f:
-    reader = csv.reader(f)
-    texts = list(reader)
+import argparse
+import cdr
+import streaming
+from hyperloglog import HyperLogLog, errorBound
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--approx', action='store_true')
+parser.add_argument('--error', type=errorBound, default=0.01)
+args = parser.parse_args()
 
-with open('calls.csv', 'r') as f:
-    reader = csv.reader(f)
-    calls = list(reader)
+table = cdr.load()
 
 
 """
 TASK 1:
-How many different telephone numbers are there in the records? 
+How many different telephone numbers are there in the records?
 Print a message:
 "There are <count> different telephone numbers in the records."
 """
 
-# Worst case Big-O: 2n^2
-
+# Worst case Big-O: 1 (numbers are already interned by cdr.load())
+# Approximate: n, in fixed memory
 
-numbers = []
 
-for t in texts:
-    if t[0] not in numbers:
-        numbers.append(t[0])
-    if t[1] not in numbers:
-        numbers.append(t[1])
+print(f'There are {len(table.numbers)} different telephone numbers in the records.')
 
-for c in calls:
-    if c[0] not in numbers:
-        numbers.append(c[0])
-    if c[1] not in numbers:
-        numbers.append(c[1])
+if args.approx:
+    counter = HyperLogLog(args.error)
+    for path in ('calls.csv', 'texts.csv'):
+        for chunk in streaming.readChunks(path):
+            for record in chunk:
+                counter.add(record[0])
+                counter.add(record[1])
 
-print(f'There are {len(numbers)} different telephone numbers in the records.')
+    error = "{:.2f}".format(100 * counter.standardError())
+    print(f'Approximately {counter.estimate()} different telephone numbers (standard error {error}%, {counter.memoryBytes()} bytes).')
@@ -1,46 +1,63 @@
 """
 Read file into texts and calls.
 It's ok if you don't understand how to read files
+
+Run with --stream to read calls.csv in chunks instead of loading it,
+and --top K to also print a leaderboard of the K longest totals.
 """
-import csv
-with open('texts.csv', 'r') as f:
-    reader = csv.reader(f)
-    texts = list(reader)
+import argparse
+import cdr
+import streaming
 
-with open('calls.csv', 'r') as f:
-    reader = csv.reader(f)
-    calls = list(reader)
+parser = argparse.ArgumentParser()
+parser.add_argument('--stream', action='store_true')
+parser.add_argument('--chunk-size', type=streaming.positiveInt, default=streaming.DEFAULT_CHUNK_SIZE)
+parser.add_argument('--top', type=streaming.positiveInt, default=1)
+args = parser.parse_args()
 
 """
 TASK 2: Which telephone number spent the longest time on the phone
 during the period? Don't forget that time spent answering a call is
 also time spent on the phone.
 Print a message:
-"<telephone number> spent the longest time, <total time> seconds, on the phone during 
+"<telephone number> spent the longest time, <total time> seconds, on the phone during
 September 2016.".
 """
 
-# Worst case Big-O: 5n
+# Worst case Big-O: 3n (streaming: n log k)
+
 
+if args.stream:
+    totals, top = streaming.streamTotals('calls.csv', args.top, args.chunk_size)
+    leaderboard = top.leaderboard()
+else:
+    table = cdr.load()
 
+    # Total seconds per number id. Ids follow first appearance in calls.csv,
+    # so ties resolve to the same number as a dict in insertion order would.
+    totals = [0] * len(table.numbers)
 
-callsDict = {}
+    for caller, callee, duration in zip(table.callCaller, table.callCallee, table.callDuration):
+        totals[caller] += duration
+        totals[callee] += duration
 
-for c in calls:
-    if c[0] not in callsDict:   #Add if does not exist
-        callsDict[c[0]] = int(c[3])
-    else:                       # else increment
-        callsDict[c[0]] += int(c[3])
+    if args.top == 1:
+        key = 0
 
-    if c[1] not in callsDict:   #Add if does not exist
-        callsDict[c[1]] = int(c[3])
-    else:                       # else increment
-        callsDict[c[1]] += int(c[3])
+        for d in range(len(totals)):
+            if totals[d] > totals[key]:
+                key = d
 
-key = next(iter(callsDict))
+        leaderboard = [(table.numbers[key], totals[key])]
+    else:
+        # Stable sort, so ties also rank by first appearance, as in streaming.TopK
+        ranked = sorted(range(len(totals)), key=lambda d: -totals[d])[:args.top]
+        leaderboard = [(table.numbers[d], totals[d]) for d in ranked]
 
-for d in callsDict:
-    if callsDict[d] > callsDict[key]:
-        key = d
+number, seconds = leaderboard[0]
+print(f'{number} spent the longest time, {seconds} seconds, on the phone during September 2016.')
 
-print(f'{key} spent the longest time, {callsDict[key]} seconds, on the phone during September 2016.')
+if args.top > 1:
+    print(f'Top {args.top}:')
+    for number, seconds in leaderboard:
+        print(f'{number}: {seconds} seconds')
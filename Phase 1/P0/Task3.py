@@ -2,15 +2,10 @@
 Read file into texts and calls.
 It's ok if you don't understand how to read files.
 """
-import csv
+import cdr
+import numberIndex
 
-with open('texts.csv', 'r') as f:
-    reader = csv.reader(f)
-    texts = list(reader)
-
-with open('calls.csv', 'r') as f:
-    reader = csv.reader(f)
-    calls = list(reader)
+table = cdr.load()
 
 """
 TASK 3:
@@ -45,55 +40,20 @@ to other fixed lines in Bangalore."
 The percentage should have 2 decimal digits
 """
 
-# Worst case Big-O: 10n + nlogn
-
-
-def isBangaloreNumber(num):
-    return num.startswith('(080)')
-
-def getAreaCodeOrPrefix(num):
-    if num[0] == '(':
-        # landline
-        return getAreaCode(num)
-    elif num.startswith('140'):
-        # telemarketer
-        return '140'
-    else:
-        # mobile
-        return getMobilePrefix(num)
-
-def getAreaCode(num):
-    code = ''
-    for c in num:
-        code += c
-        if c == ')':
-            break
-    return code
-
-def getMobilePrefix(num):
-    prefix = ''
-    for i in range(4):
-        prefix += num[i]
-    return prefix
+# Worst case Big-O: 2n + clogc, for c distinct codes
 
-calledNums = []
-outgoingBangaloreNumsCount = 0;
-calledBangaloreNumsCount = 0;
-for c in calls:
-    if isBangaloreNumber(c[0]):
-        outgoingBangaloreNumsCount+=1
-        numCode = getAreaCodeOrPrefix(c[1])
-        if isBangaloreNumber(numCode):
-            calledBangaloreNumsCount+=1
-        if numCode not in calledNums:
-            calledNums.append(numCode)
+BANGALORE = '(080)'
 
-calledNums.sort()
+# Classify each distinct number once, then count calls per code pair
+codes = [numberIndex.code(num) for num in table.numbers]
+index = numberIndex.AreaCodeIndex()
+for caller, callee in zip(table.callCaller, table.callCallee):
+    index.add(codes[caller], codes[callee])
 
 print('The numbers called by people in Bangalore have codes:')
-for num in calledNums:
+for num in index.codesCalledFrom(BANGALORE):
     print(num)
 
-percentBangalore =  100.00 * calledBangaloreNumsCount / outgoingBangaloreNumsCount
+percentBangalore = index.percentIntraArea(BANGALORE)
 formatPercent = "{:.2f}".format(percentBangalore)
 print(f'{formatPercent} percent of calls from fixed lines in Bangalore are calls to other fixed lines in Bangalore.')
@@ -2,15 +2,10 @@
 Read file into texts and calls.
 It's ok if you don't understand how to read files.
 """
-import csv
+import cdr
+from telemarketers import findTelemarketers
 
-with open('texts.csv', 'r') as f:
-    reader = csv.reader(f)
-    texts = list(reader)
-
-with open('calls.csv', 'r') as f:
-    reader = csv.reader(f)
-    calls = list(reader)
+table = cdr.load()
 
 """
 TASK 4:
@@ -25,34 +20,13 @@ Print a message:
 The list of numbers should be print out one per line in lexicographic order with no duplicates.
 """
 
-# Worst case Big-O: n^2 + nlogn
-
-possibleTelemarketers = []
-hasSentText = False
-hasReceivedCall = False
+# Worst case Big-O: 3n + nlogn
 
-for c in calls:
-    if c[0] in possibleTelemarketers:
-        continue
-    hasSentText = False
-    hasReceivedCall = False
-    for t in texts:
-        # check if number has sent or received texts
-        if c[0] == t[0] or c[0] == t[1]:
-            hasSentText = True
-            break
-
-    if hasSentText == False:
-        # if no texts, check if recieved calls
-        for subC in calls:
-            if c[0] == subC[1]:
-                hasReceivedCall = True
-                break
-    if hasReceivedCall == False and hasSentText == False:
-        possibleTelemarketers.append(c[0])
+callRecords = zip(table.callCaller, table.callCallee)
+textRecords = zip(table.textSender, table.textReceiver)
+possibleTelemarketers = findTelemarketers(callRecords, textRecords)
 
 print('These numbers could be telemarketers: ')
-possibleTelemarketers.sort()
+possibleTelemarketers = sorted(table.numbers[t] for t in possibleTelemarketers)
 for t in possibleTelemarketers:
     print(t)
-
@@ -0,0 +1,99 @@
+"""
+Benchmark runner for Task0.py-Task4.py.
+
+For each size, synthetic calls.csv/texts.csv files are generated (see
+syntheticCdr.py) and every task is run in its own process, so that its
+wall-clock time and peak resident memory are measured on their own.
+The binary cache (cdr.cache) is removed before each run unless --cache
+is given, so by default every task pays the full csv parse.
+
+Results are written as JSON, to be compared between commits.
+
+Usage: python benchmark.py [--rows 10000 1000000 50000000] [--output FILE]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import runpy
+import subprocess
+import sys
+import tempfile
+import time
+
+import cdr
+import syntheticCdr
+
+DIR = os.path.dirname(os.path.realpath(__file__))
+TASKS = [f'Task{i}.py' for i in range(5)]
+DEFAULT_ROWS = [10000, 1000000, 50000000]
+
+
+def runChild(script):
+    # Runs inside the child process: run one task, report time and peak memory
+    sys.path.insert(0, DIR)
+    sys.argv = [script]
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull:
+        stdout = sys.stdout
+        sys.stdout = devnull
+        try:
+            runpy.run_path(os.path.join(DIR, script), run_name='__main__')
+        finally:
+            sys.stdout = stdout
+    seconds = time.perf_counter() - start
+    maxRssKb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'seconds': seconds, 'maxRssKb': maxRssKb}))
+
+
+def runTask(script, dataDir, keepCache):
+    if not keepCache:
+        cachePath = os.path.join(dataDir, cdr.CACHE_FILE)
+        if os.path.exists(cachePath):
+            os.remove(cachePath)
+
+    output = subprocess.run([sys.executable, os.path.realpath(__file__), '--child', script],
+                            cwd=dataDir, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.splitlines()[-1])
+
+
+def benchmark(rowCounts, tasks, keepCache):
+    results = []
+    for rows in rowCounts:
+        with tempfile.TemporaryDirectory() as dataDir:
+            start = time.perf_counter()
+            syntheticCdr.generate(rows, dataDir)
+            print(f'{rows} rows: generated in {time.perf_counter() - start:.1f}s')
+
+            for script in tasks:
+                result = runTask(script, dataDir, keepCache)
+                result.update({'rows': rows, 'task': script})
+                results.append(result)
+                print(f'  {script}: {result["seconds"]:.3f}s, {result["maxRssKb"]} KB')
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('--tasks', nargs='+', default=TASKS)
+    parser.add_argument('--cache', action='store_true')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--child')
+    args = parser.parse_args()
+
+    if args.child:
+        runChild(args.child)
+        sys.exit()
+
+    results = benchmark(args.rows, args.tasks, args.cache)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'cache': args.cache,
+            'results': results,
+        }, f, indent=4)
+    print(f'Results written to {args.output}')
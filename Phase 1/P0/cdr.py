@@ -0,0 +1,145 @@
+"""
+Single-pass columnar loader for calls.csv and texts.csv.
+
+Each file is parsed once into compact typed columns:
+ - every telephone number is interned into one shared number table, and
+   callers/callees are stored as integer ids into that table
+ - timestamps are parsed to epoch seconds (UTC, no timezone in the data)
+ - call durations are stored as integers, so tasks never call int() again
+
+Columns are 'array' buffers rather than lists of lists of strings.
+Numbers are interned calls first, then texts, so number ids follow the
+order in which numbers first appear in calls.csv.
+
+Tables are memoised per (callsPath, textsPath), so every task run in the
+same process shares one in-memory table. Across processes, the parsed
+table is saved to a binary columnar cache (see cdrCache.py) next to
+calls.csv, which later runs memory-map instead of parsing the csv files.
+Tables loaded from the cache are read-only.
+
+Complexity: O(n) to load, where n is the total number of records.
+"""
+import array
+import calendar
+import csv
+import os
+import sys
+import time
+
+TIME_FORMAT = '%d-%m-%Y %H:%M:%S'
+CACHE_FILE = 'cdr.cache'
+
+_tables = {}
+
+
+class CdrTable:
+
+    def __init__(self):
+        self.numbers = []       # id -> number string
+        self.numberIds = {}     # number string -> id
+
+        self.callCaller = array.array('i')
+        self.callCallee = array.array('i')
+        self.callTime = array.array('q')
+        self.callDuration = array.array('i')
+
+        self.textSender = array.array('i')
+        self.textReceiver = array.array('i')
+        self.textTime = array.array('q')
+
+        self._dayCache = {}
+
+    def numberId(self, num):
+        # Intern number, returning its id in the shared number table
+        numId = self.numberIds.get(num)
+        if numId is None:
+            numId = len(self.numbers)
+            num = sys.intern(num)
+            self.numberIds[num] = numId
+            self.numbers.append(num)
+        return numId
+
+    def parseTime(self, timeStr):
+        # 'dd-mm-yyyy HH:MM:SS' -> epoch seconds. Dates repeat constantly,
+        # so the date part is converted once and cached.
+        day = timeStr[:10]
+        dayStart = self._dayCache.get(day)
+        if dayStart is None:
+            dayStart = calendar.timegm(time.strptime(day, '%d-%m-%Y'))
+            self._dayCache[day] = dayStart
+        return (dayStart
+                + int(timeStr[11:13]) * 3600
+                + int(timeStr[14:16]) * 60
+                + int(timeStr[17:19]))
+
+    def addCall(self, caller, callee, timeStr, duration):
+        self.callCaller.append(self.numberId(caller))
+        self.callCallee.append(self.numberId(callee))
+        self.callTime.append(self.parseTime(timeStr))
+        self.callDuration.append(int(duration))
+
+    def addText(self, sender, receiver, timeStr):
+        self.textSender.append(self.numberId(sender))
+        self.textReceiver.append(self.numberId(receiver))
+        self.textTime.append(self.parseTime(timeStr))
+
+    def callCount(self):
+        return len(self.callCaller)
+
+    def textCount(self):
+        return len(self.textSender)
+
+    def callRecord(self, i):
+        # Rebuild the original csv row for call i
+        return [self.numbers[self.callCaller[i]],
+                self.numbers[self.callCallee[i]],
+                formatTime(self.callTime[i]),
+                str(self.callDuration[i])]
+
+    def textRecord(self, i):
+        # Rebuild the original csv row for text i
+        return [self.numbers[self.textSender[i]],
+                self.numbers[self.textReceiver[i]],
+                formatTime(self.textTime[i])]
+
+
+def formatTime(epoch):
+    return time.strftime(TIME_FORMAT, time.gmtime(epoch))
+
+
+def readCalls(table, path):
+    with open(path, 'r') as f:
+        for c in csv.reader(f):
+            table.addCall(c[0], c[1], c[2], c[3])
+
+
+def readTexts(table, path):
+    with open(path, 'r') as f:
+        for t in csv.reader(f):
+            table.addText(t[0], t[1], t[2])
+
+
+def defaultCachePath(callsPath):
+    return os.path.join(os.path.dirname(callsPath), CACHE_FILE)
+
+
+def load(callsPath='calls.csv', textsPath='texts.csv', cachePath=None, useCache=True):
+    key = (callsPath, textsPath)
+    table = _tables.get(key)
+    if table is not None:
+        return table
+
+    if useCache:
+        import cdrCache
+        cachePath = cachePath or defaultCachePath(callsPath)
+        table = cdrCache.load(cachePath, callsPath, textsPath)
+
+    if table is None:
+        table = CdrTable()
+        readCalls(table, callsPath)
+        readTexts(table, textsPath)
+        if useCache:
+            cdrCache.write(table, cachePath, callsPath, textsPath)
+
+    _tables[key] = table
+    return table
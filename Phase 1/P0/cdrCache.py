@@ -0,0 +1,188 @@
+"""
+Binary columnar cache of a parsed CdrTable.
+
+Layout (little endian, every section starts on an 8 byte boundary):
+ - header: magic, version, row counts, and the size, mtime and crc32 of
+   each source csv file
+ - number table: the numbers, utf-8, newline separated (dictionary encoding)
+ - columns: callCaller, callCallee (int32), callTime (int64),
+   callDuration (int32), textSender, textReceiver (int32), textTime (int64)
+
+Loading memory-maps the file and casts each column in place, so startup
+only costs decoding the number table, not parsing every record.
+
+The cache is fresh when both csv files have the recorded size and either
+the recorded mtime or the recorded crc32, and the file is as long as its
+header says. Otherwise it is stale and is rebuilt by cdr.load().
+Writing is best effort: if the cache cannot be written (e.g. a read-only
+directory) the tables are still loaded from the csv files.
+
+Complexity: O(m) to load for m distinct numbers, O(n) to write.
+"""
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+import cdr
+
+MAGIC = b'CDRC'
+VERSION = 1
+HEADER = struct.Struct('<4sHHQQQQQQQIIQ')
+
+# (attribute, typecode) in file order
+COLUMNS = [
+    ('callCaller', 'i'),
+    ('callCallee', 'i'),
+    ('callTime', 'q'),
+    ('callDuration', 'i'),
+    ('textSender', 'i'),
+    ('textReceiver', 'i'),
+    ('textTime', 'q'),
+]
+
+
+def checksum(path):
+    crc = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            crc = zlib.crc32(block, crc)
+    return crc
+
+
+def _pad(offset):
+    return (offset + 7) & ~7
+
+
+def _sourceInfo(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def write(table, cachePath, callsPath, textsPath):
+    # Returns True if the cache was written
+    callsSize, callsMtime = _sourceInfo(callsPath)
+    textsSize, textsMtime = _sourceInfo(textsPath)
+    numberTable = '\n'.join(table.numbers).encode()
+
+    header = HEADER.pack(MAGIC, VERSION, 0,
+                         len(table.numbers), table.callCount(), table.textCount(),
+                         callsSize, callsMtime, textsSize, textsMtime,
+                         checksum(callsPath), checksum(textsPath),
+                         len(numberTable))
+
+    # Write to a temporary file then rename, so readers never see a partial cache
+    tempPath = f'{cachePath}.{os.getpid()}.tmp'
+    try:
+        with open(tempPath, 'wb') as f:
+            f.write(header)
+            f.write(numberTable)
+            for name, _ in COLUMNS:
+                f.write(b'\0' * (_pad(f.tell()) - f.tell()))
+                f.write(getattr(table, name).tobytes())
+        os.replace(tempPath, cachePath)
+    except OSError:
+        try:
+            os.remove(tempPath)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def _isFresh(path, size, mtime, crc):
+    try:
+        currentSize, currentMtime = _sourceInfo(path)
+    except OSError:
+        return False
+    if currentSize != size:
+        return False
+    return currentMtime == mtime or checksum(path) == crc
+
+
+def load(cachePath, callsPath, textsPath):
+    # Returns a read-only CdrTable backed by the memory-mapped cache, or None if stale
+    try:
+        f = open(cachePath, 'rb')
+    except OSError:
+        return None
+
+    with f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            return None
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    (magic, version, _, numberCount, callCount, textCount,
+     callsSize, callsMtime, textsSize, textsMtime,
+     callsCrc, textsCrc, numberTableSize) = HEADER.unpack_from(mm)
+
+    if (magic != MAGIC or version != VERSION
+            or not _isFresh(callsPath, callsSize, callsMtime, callsCrc)
+            or not _isFresh(textsPath, textsSize, textsMtime, textsCrc)):
+        mm.close()
+        return None
+
+    # (offset, length) of each column, checked against the file's length
+    counts = {'call': callCount, 'text': textCount}
+    sections = []
+    end = HEADER.size + numberTableSize
+    for name, typecode in COLUMNS:
+        offset = _pad(end)
+        end = offset + counts[name[:4]] * struct.calcsize(typecode)
+        sections.append((name, typecode, offset, end))
+    if len(mm) < end:
+        mm.close()
+        return None
+
+    table = cdr.CdrTable()
+    offset = HEADER.size
+    if numberCount > 0:
+        table.numbers = [sys.intern(n) for n in mm[offset:offset+numberTableSize].decode().split('\n')]
+        table.numberIds = {n: i for i, n in enumerate(table.numbers)}
+
+    view = memoryview(mm)
+    for name, typecode, offset, end in sections:
+        setattr(table, name, view[offset:end].cast(typecode))
+
+    return table
+
+
+if __name__ == '__main__' and sys.argv[1:] == ['--test']:
+    import shutil
+    import tempfile
+
+    print('\nBEGIN TESTS')
+    workDir = tempfile.mkdtemp()
+    calls = os.path.join(workDir, 'calls.csv')
+    texts = os.path.join(workDir, 'texts.csv')
+    cachePath = os.path.join(workDir, cdr.CACHE_FILE)
+    shutil.copy('calls.csv', calls)
+    shutil.copy('texts.csv', texts)
+    table = cdr.load(calls, texts, useCache=False)
+
+    # Test a written cache loads the same columns
+    write(table, cachePath, calls, texts)
+    cached = load(cachePath, calls, texts)
+    passed = cached.numbers == table.numbers and all(
+        list(getattr(cached, name)) == list(getattr(table, name)) for name, _ in COLUMNS)
+    print(f'Test 1 {"Passed" if passed else "Failed"}')
+
+    # Test a truncated cache is stale, not read short
+    del cached
+    with open(cachePath, 'r+b') as f:
+        f.truncate(100000)
+    print(f'Test 2 {"Passed" if load(cachePath, calls, texts) is None else "Failed"}')
+
+    # Test a cache that cannot be written does not fail the load
+    missingDir = os.path.join(workDir, 'missing', cdr.CACHE_FILE)
+    passed = not write(table, missingDir, calls, texts) and not os.path.exists(os.path.dirname(missingDir))
+    print(f'Test 3 {"Passed" if passed else "Failed"}')
+
+    print('END TESTS\n')
+    shutil.rmtree(workDir, ignore_errors=True)
+elif __name__ == '__main__':
+    # Convert calls.csv/texts.csv in the current directory to the cache up front
+    table = cdr.load(useCache=False)
+    write(table, cdr.defaultCachePath('calls.csv'), 'calls.csv', 'texts.csv')
+    print(f'Wrote {cdr.CACHE_FILE}: {len(table.numbers)} numbers, {table.callCount()} calls, {table.textCount()} texts')
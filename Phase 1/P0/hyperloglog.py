@@ -0,0 +1,90 @@
+"""
+HyperLogLog approximate distinct counter.
+
+Each value is hashed to 64 bits. The first p bits choose one of m = 2^p
+registers, and the register keeps the longest run of leading zeros seen
+in the remaining bits. The harmonic mean of the registers estimates the
+number of distinct values, with a standard error of about 1.04 / sqrt(m).
+
+The hash is blake2b rather than hash(), which is salted per process, so
+counters built in different processes (shards, time windows) can be
+merged by taking the maximum of each register.
+
+Complexity: O(1) per value added, O(m) to estimate or merge.
+Space: m bytes, whatever the number of values.
+"""
+import argparse
+import math
+import sys
+from hashlib import blake2b
+
+MIN_PRECISION = 4
+MAX_PRECISION = 18
+MIN_ERROR = 1.04 / math.sqrt(1 << MAX_PRECISION)   # about 0.2%
+
+
+def precisionForError(error):
+    # Smallest p whose standard error 1.04 / sqrt(2^p) is within error
+    if not MIN_ERROR <= error:
+        raise ValueError(f'standard error must be at least {MIN_ERROR:.5f}')
+    p = math.ceil(math.log2((1.04 / error) ** 2))
+    return min(max(p, MIN_PRECISION), MAX_PRECISION)
+
+
+def errorBound(text):
+    # argparse type for a standard error this counter can meet
+    error = float(text)
+    if not MIN_ERROR <= error:
+        raise argparse.ArgumentTypeError(f'{text} is below the smallest standard error, {MIN_ERROR:.5f}')
+    return error
+
+
+class HyperLogLog:
+
+    def __init__(self, error=0.01):
+        self.p = precisionForError(error)
+        self.m = 1 << self.p
+        self.registers = bytearray(self.m)
+
+    def add(self, value):
+        h = int.from_bytes(blake2b(value.encode(), digest_size=8).digest(), 'big')
+        index = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values):
+        for v in values:
+            self.add(v)
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError('Cannot merge HyperLogLogs with different precision')
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def standardError(self):
+        return 1.04 / math.sqrt(self.m)
+
+    def memoryBytes(self):
+        return sys.getsizeof(self.registers)
+
+    def estimate(self):
+        m = self.m
+        if m == 16:
+            alpha = 0.673
+        elif m == 32:
+            alpha = 0.697
+        elif m == 64:
+            alpha = 0.709
+        else:
+            alpha = 0.7213 / (1 + 1.079 / m)
+
+        e = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+
+        # Small range correction: use linear counting while registers are empty
+        zeros = self.registers.count(0)
+        if e <= 2.5 * m and zeros > 0:
+            e = m * math.log(m / zeros)
+
+        return round(e)
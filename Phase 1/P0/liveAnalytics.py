@@ -0,0 +1,235 @@
+"""
+Incremental Task 1-4 answers over appended CDR batches.
+
+CdrAggregator keeps the state each task needs:
+ - Task 1: set of numbers seen
+ - Task 2: per-number totals and a top-K leaderboard (streaming.TopK)
+ - Task 3: calls per (caller code, receiver code) (numberIndex.AreaCodeIndex)
+ - Task 4: caller and excluded-number sets (TelemarketerDetector)
+
+Applying a batch costs O(b log k) for b records, whatever has been seen
+before. Tasks 1-3 are read in O(1)/O(c log c) for c codes; Task 4 is a
+set difference over the callers.
+
+Run as a script, it tails calls.csv and texts.csv, applies every newly
+appended complete line, and prints the report whenever it changes. If a
+file shrinks it is taken to have been rotated and everything is rebuilt.
+
+Usage: python liveAnalytics.py [--interval SECONDS] [--top K] [--once]
+       python liveAnalytics.py --test
+"""
+import argparse
+import csv
+import os
+import time
+
+import numberIndex
+import streaming
+from telemarketers import TelemarketerDetector
+
+BANGALORE = '(080)'
+CALL_FIELDS = 4
+TEXT_FIELDS = 3
+# A partial last line unchanged for this long is taken to be a final row
+# written without a newline, rather than a writer paused mid-row
+QUIET_SECONDS = 60.0
+
+
+class CdrAggregator:
+
+    def __init__(self, top=1):
+        self.numbers = set()
+        self.totals = {}
+        self.top = streaming.TopK(top)
+        self.areaCodes = numberIndex.AreaCodeIndex()
+        self.detector = TelemarketerDetector()
+        self.callCount = 0
+        self.textCount = 0
+
+    def applyCalls(self, calls):
+        calls = list(calls)
+        for c in calls:
+            duration = int(c[3])
+            for number in (c[0], c[1]):
+                self.numbers.add(number)
+                total = self.totals.get(number, 0) + duration
+                self.totals[number] = total
+                self.top.update(number, total)
+        self.areaCodes.addCalls(calls)
+        self.detector.addCalls(calls)
+        self.callCount += len(calls)
+
+    def applyTexts(self, texts):
+        texts = list(texts)
+        for t in texts:
+            self.numbers.add(t[0])
+            self.numbers.add(t[1])
+        self.detector.addTexts(texts)
+        self.textCount += len(texts)
+
+    def distinctNumbers(self):
+        return len(self.numbers)
+
+    def longestOnPhone(self):
+        # (number, seconds), or None before any calls
+        leaderboard = self.top.leaderboard()
+        return leaderboard[0] if leaderboard else None
+
+    def leaderboard(self):
+        return self.top.leaderboard()
+
+    def codesCalledFrom(self, areaCode=BANGALORE):
+        return self.areaCodes.codesCalledFrom(areaCode)
+
+    def percentIntraArea(self, areaCode=BANGALORE):
+        return self.areaCodes.percentIntraArea(areaCode)
+
+    def telemarketers(self):
+        return sorted(self.detector.candidates())
+
+    def report(self):
+        lines = [f'{self.callCount} calls, {self.textCount} texts',
+                 f'There are {self.distinctNumbers()} different telephone numbers in the records.']
+
+        longest = self.longestOnPhone()
+        if longest is not None:
+            lines.append(f'{longest[0]} spent the longest time, {longest[1]} seconds, on the phone.')
+
+        lines.append('The numbers called by people in Bangalore have codes:')
+        lines.extend(self.codesCalledFrom())
+        percent = self.percentIntraArea()
+        if percent is not None:
+            lines.append(f'{percent:.2f} percent of calls from fixed lines in Bangalore are calls to other fixed lines in Bangalore.')
+
+        lines.append('These numbers could be telemarketers: ')
+        lines.extend(self.telemarketers())
+        return '\n'.join(lines)
+
+
+class FileFollower:
+    """
+    Returns the complete csv rows appended to a file since the last read.
+    A trailing partial line is kept until the rest of it is written. It is
+    only taken as a final row written without a newline when flush is set
+    (--once), or when the file has not grown for quietSeconds.
+    Rows without the expected number of fields are skipped and counted.
+    """
+
+    def __init__(self, path, fields, quietSeconds=QUIET_SECONDS, clock=time.monotonic):
+        self.path = path
+        self.fields = fields
+        self.quietSeconds = quietSeconds
+        self.clock = clock
+        self.offset = 0
+        self.partial = b''
+        self.lastGrowth = clock()
+        self.skipped = 0
+
+    def rotated(self):
+        try:
+            return os.path.getsize(self.path) < self.offset
+        except OSError:
+            return False
+
+    def read(self, flush=False):
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset)
+                data = f.read()
+        except OSError:
+            return []
+        self.offset += len(data)
+
+        now = self.clock()
+        if data:
+            self.lastGrowth = now
+        flush = flush or now - self.lastGrowth >= self.quietSeconds
+        data = self.partial + data
+        end = len(data) if flush else data.rfind(b'\n') + 1
+        self.partial = data[end:]
+
+        rows = []
+        for row in csv.reader(data[:end].decode(errors='replace').splitlines()):
+            if len(row) == self.fields:
+                rows.append(row)
+            elif row:
+                # Blank rows come from a flushed row's line ending arriving later
+                self.skipped += 1
+        return rows
+
+
+def follow(callsPath='calls.csv', textsPath='texts.csv', interval=5.0, top=1, once=False):
+    aggregator = CdrAggregator(top)
+    calls = FileFollower(callsPath, CALL_FIELDS)
+    texts = FileFollower(textsPath, TEXT_FIELDS)
+
+    while True:
+        if calls.rotated() or texts.rotated():
+            aggregator = CdrAggregator(top)
+            calls = FileFollower(callsPath, CALL_FIELDS)
+            texts = FileFollower(textsPath, TEXT_FIELDS)
+
+        newCalls = calls.read(flush=once)
+        newTexts = texts.read(flush=once)
+        if newCalls or newTexts:
+            aggregator.applyCalls(newCalls)
+            aggregator.applyTexts(newTexts)
+            print(aggregator.report(), end='\n\n', flush=True)
+
+        if once:
+            return aggregator
+        time.sleep(interval)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--interval', type=float, default=5.0)
+    parser.add_argument('--top', type=streaming.positiveInt, default=1)
+    parser.add_argument('--once', action='store_true')
+    parser.add_argument('--test', action='store_true')
+    args = parser.parse_args()
+
+    if not args.test:
+        follow(interval=args.interval, top=args.top, once=args.once)
+    else:
+        import tempfile
+
+        def append(text):
+            with open(path, 'a', newline='') as f:
+                f.write(text)
+
+        print('\nBEGIN TESTS')
+        path = os.path.join(tempfile.mkdtemp(), 'calls.csv')
+        now = [0.0]
+        follower = FileFollower(path, CALL_FIELDS, quietSeconds=60, clock=lambda: now[0])
+
+        # Test a partial line is held while the writer may still be mid-row
+        append('a,b,t,5\r\nc,d,t,12')
+        first = follower.read()
+        now[0] = 30
+        passed = first == [['a', 'b', 't', '5']] and follower.read() == []
+        print(f'Test 1 {"Passed" if passed else "Failed"}')
+
+        # Test the rest of the row completes it
+        append('34\r\n')
+        passed = follower.read() == [['c', 'd', 't', '1234']]
+        print(f'Test 2 {"Passed" if passed else "Failed"}')
+
+        # Test a final row without a newline is flushed after the quiet period, or with flush
+        append('e,f,t,7')
+        held = follower.read()
+        now[0] = 100
+        passed = held == [] and follower.read() == [['e', 'f', 't', '7']]
+        append('g,h,t,8')
+        passed = passed and follower.read(flush=True) == [['g', 'h', 't', '8']]
+        print(f'Test 3 {"Passed" if passed else "Failed"}')
+
+        # Test rows with the wrong number of fields are skipped, not applied
+        append('\r\ntruncated,row\r\ni,j,t,9\r\n')
+        rows = follower.read()
+        aggregator = CdrAggregator()
+        aggregator.applyCalls(rows)
+        passed = rows == [['i', 'j', 't', '9']] and follower.skipped == 1 and aggregator.callCount == 1
+        print(f'Test 4 {"Passed" if passed else "Failed"}')
+
+        print('END TESTS\n')
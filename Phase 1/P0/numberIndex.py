@@ -0,0 +1,85 @@
+"""
+Number classification and area-code index.
+
+Every number is normalised once into (kind, code):
+ - fixed lines:   ('fixed', '(080)')   area code including brackets
+ - telemarketers: ('telemarketer', '140')
+ - mobiles:       ('mobile', '9876')   first four digits
+
+Results are memoised, so a number that appears in many records is only
+classified once.
+
+AreaCodeIndex counts calls per (caller code, receiver code) in one pass,
+after which "codes called from area X" and "percentage of intra-area
+calls" can be answered for any area code, not just (080).
+
+Complexity: O(n) to build the index, O(c log c) to list the c codes
+called from an area, O(c) for the intra-area percentage.
+"""
+
+FIXED = 'fixed'
+MOBILE = 'mobile'
+TELEMARKETER = 'telemarketer'
+
+_memo = {}
+
+
+def classify(num):
+    result = _memo.get(num)
+    if result is None:
+        if num[0] == '(':
+            result = (FIXED, num[:num.index(')')+1])
+        elif num.startswith('140'):
+            result = (TELEMARKETER, '140')
+        else:
+            result = (MOBILE, num[:4])
+        _memo[num] = result
+    return result
+
+
+def code(num):
+    return classify(num)[1]
+
+
+class AreaCodeIndex:
+
+    def __init__(self):
+        self.calls = {}     # caller code -> {receiver code: count}
+
+    def add(self, callerCode, receiverCode):
+        called = self.calls.get(callerCode)
+        if called is None:
+            called = self.calls[callerCode] = {}
+        called[receiverCode] = called.get(receiverCode, 0) + 1
+
+    def addCalls(self, calls):
+        # calls: iterable of (caller, receiver, ...) records
+        for c in calls:
+            self.add(code(c[0]), code(c[1]))
+
+    def merge(self, other):
+        # Combine with an index built from another batch or shard
+        for callerCode, called in other.calls.items():
+            for receiverCode, count in called.items():
+                mine = self.calls.setdefault(callerCode, {})
+                mine[receiverCode] = mine.get(receiverCode, 0) + count
+
+    def codesCalledFrom(self, areaCode):
+        # Codes called from areaCode, in lexicographic order
+        return sorted(self.calls.get(areaCode, ()))
+
+    def callsFrom(self, areaCode):
+        return sum(self.calls.get(areaCode, {}).values())
+
+    def percentIntraArea(self, areaCode):
+        # Percentage of calls from areaCode made to areaCode. None if no calls.
+        total = self.callsFrom(areaCode)
+        if total == 0:
+            return None
+        return 100.00 * self.calls[areaCode].get(areaCode, 0) / total
+
+
+def buildIndex(calls):
+    index = AreaCodeIndex()
+    index.addCalls(calls)
+    return index
@@ -0,0 +1,164 @@
+"""
+Multiprocess sharded version of Tasks 1-4.
+
+calls.csv and texts.csv are split into byte-range shards that start and
+end on line boundaries. Each shard is processed by a worker in a process
+pool, which returns partial results:
+ - the set of numbers seen (Task 1)
+ - per-number duration totals (Task 2)
+ - an AreaCodeIndex of calls per code pair (Task 3)
+ - a TelemarketerDetector holding caller/excluded sets (Task 4)
+
+The partial results are then merged, and the same messages that
+Task1.py-Task4.py print are printed.
+
+Shards are merged in file order, so the merged totals dict keeps numbers
+in order of first appearance and Task 2 ties resolve exactly as before.
+
+Complexity: O(n / p) per worker for p workers, plus O(m) to merge m
+distinct numbers.
+"""
+import argparse
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numberIndex
+from telemarketers import TelemarketerDetector
+
+
+def shardFile(path, shards):
+    # Returns [(start, end)] byte ranges, each starting at the beginning of a line
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, shards):
+            f.seek(max(size * i // shards, bounds[-1]))
+            if f.tell() > 0:
+                f.seek(f.tell() - 1)
+                f.readline()    # move to the start of the next full line
+            bounds.append(min(f.tell(), size))
+    bounds.append(size)
+    return [(bounds[i], bounds[i+1]) for i in range(shards) if bounds[i] < bounds[i+1]]
+
+
+def readShard(path, start, end):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return csv.reader(data.decode().splitlines())
+
+
+class CallsPartial:
+
+    def __init__(self):
+        self.numbers = set()
+        self.totals = {}
+        self.areaCodes = numberIndex.AreaCodeIndex()
+        self.detector = TelemarketerDetector()
+
+    def add(self, rows):
+        totals = self.totals
+        for c in rows:
+            duration = int(c[3])
+            totals[c[0]] = totals.get(c[0], 0) + duration
+            totals[c[1]] = totals.get(c[1], 0) + duration
+
+            self.areaCodes.add(numberIndex.code(c[0]), numberIndex.code(c[1]))
+
+            self.detector.callers.add(c[0])
+            self.detector.excluded.add(c[1])
+
+        self.numbers.update(totals)
+
+    def merge(self, other):
+        self.numbers |= other.numbers
+        for number, total in other.totals.items():
+            self.totals[number] = self.totals.get(number, 0) + total
+        self.areaCodes.merge(other.areaCodes)
+        self.detector.merge(other.detector)
+
+
+class TextsPartial:
+
+    def __init__(self):
+        self.numbers = set()
+
+    def add(self, rows):
+        for t in rows:
+            self.numbers.add(t[0])
+            self.numbers.add(t[1])
+
+    def merge(self, other):
+        self.numbers |= other.numbers
+
+
+def processCalls(path, start, end):
+    partial = CallsPartial()
+    partial.add(readShard(path, start, end))
+    return partial
+
+
+def processTexts(path, start, end):
+    partial = TextsPartial()
+    partial.add(readShard(path, start, end))
+    return partial
+
+
+def mergeAll(partials, merged):
+    for p in partials:
+        merged.merge(p)
+    return merged
+
+
+def run(callsPath='calls.csv', textsPath='texts.csv', workers=None, shards=None):
+    workers = workers or os.cpu_count()
+    shards = shards or workers * 4
+
+    with ProcessPoolExecutor(workers) as pool:
+        callShards = shardFile(callsPath, shards)
+        textShards = shardFile(textsPath, shards)
+        callFutures = [pool.submit(processCalls, callsPath, s, e) for s, e in callShards]
+        textFutures = [pool.submit(processTexts, textsPath, s, e) for s, e in textShards]
+
+        # Merge in shard order so first-appearance order is preserved
+        calls = mergeAll((f.result() for f in callFutures), CallsPartial())
+        texts = mergeAll((f.result() for f in textFutures), TextsPartial())
+
+    return calls, texts
+
+
+def report(calls, texts):
+    # Task 1
+    numbers = calls.numbers | texts.numbers
+    print(f'There are {len(numbers)} different telephone numbers in the records.')
+
+    # Task 2
+    key = next(iter(calls.totals))
+    for d in calls.totals:
+        if calls.totals[d] > calls.totals[key]:
+            key = d
+    print(f'{key} spent the longest time, {calls.totals[key]} seconds, on the phone during September 2016.')
+
+    # Task 3
+    print('The numbers called by people in Bangalore have codes:')
+    for code in calls.areaCodes.codesCalledFrom('(080)'):
+        print(code)
+    percentBangalore = calls.areaCodes.percentIntraArea('(080)')
+    formatPercent = "{:.2f}".format(percentBangalore)
+    print(f'{formatPercent} percent of calls from fixed lines in Bangalore are calls to other fixed lines in Bangalore.')
+
+    # Task 4
+    calls.detector.excluded |= texts.numbers
+    print('These numbers could be telemarketers: ')
+    for t in sorted(calls.detector.candidates()):
+        print(t)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--shards', type=int, default=None)
+    args = parser.parse_args()
+
+    report(*run(workers=args.workers, shards=args.shards))
@@ -0,0 +1,142 @@
+"""
+Streaming, chunked aggregation of call durations.
+
+calls.csv is read through a generator in fixed-size chunks, so only one
+chunk of raw rows is held in memory at a time. Per-number totals are
+accumulated in a dict, and a bounded top-K heap is updated alongside them
+so the leaderboard is ready as soon as the last chunk is read.
+
+The top-K is exact because durations are never negative: a total only
+grows, so a number outside the top K can only enter it at the moment its
+own total is updated, which is exactly when it is checked.
+
+Complexity: O(n log k) for n records and a leaderboard of size k.
+"""
+import argparse
+import csv
+import heapq
+from itertools import islice
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def positiveInt(text):
+    # argparse type for counts that must be at least 1
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f'{text} is not a positive integer')
+    return value
+
+
+def readChunks(path, chunkSize=DEFAULT_CHUNK_SIZE):
+    # Yields lists of at most chunkSize csv rows
+    with open(path, 'r') as f:
+        reader = csv.reader(f)
+        while True:
+            chunk = list(islice(reader, chunkSize))
+            if len(chunk) == 0:
+                return
+            yield chunk
+
+
+class TopK:
+    """
+    Keeps the k largest totals seen so far. Totals may only increase.
+    Equal totals rank by first appearance, earliest first, as a stable
+    sort of the totals in insertion order would.
+    The heap can hold stale entries for members whose total has since
+    grown; they are skipped when they reach the top of the heap.
+    """
+
+    def __init__(self, k):
+        if k < 1:
+            raise ValueError('k must be at least 1')
+        self.k = k
+        self.firstSeen = {}  # number -> order of its first update
+        self.members = {}   # number -> current total
+        self.heap = []      # (total, -first seen, number), lowest ranked first
+
+    def update(self, number, total):
+        first = self.firstSeen.setdefault(number, len(self.firstSeen))
+        if number in self.members:
+            self.members[number] = total
+        elif len(self.members) < self.k:
+            self.members[number] = total
+        elif (total, -first) > self.lowestRank():
+            smallest = heapq.heappop(self.heap)[2]
+            del self.members[smallest]
+            self.members[number] = total
+        else:
+            return
+
+        heapq.heappush(self.heap, (total, -first, number))
+        if len(self.heap) > 4 * self.k:
+            self._compact()
+
+    def lowestRank(self):
+        # Drop stale entries until the top of the heap is a live member
+        while True:
+            total, first, number = self.heap[0]
+            if self.members.get(number) == total:
+                return total, first
+            heapq.heappop(self.heap)
+
+    def leaderboard(self):
+        # [(number, total)] largest first
+        return sorted(self.members.items(), key=lambda m: (-m[1], self.firstSeen[m[0]]))
+
+    def _compact(self):
+        self.heap = [(total, -self.firstSeen[number], number) for number, total in self.members.items()]
+        heapq.heapify(self.heap)
+
+
+def streamTotals(path, k=1, chunkSize=DEFAULT_CHUNK_SIZE):
+    # Returns (per-number totals dict, TopK)
+    totals = {}
+    top = TopK(k)
+
+    for chunk in readChunks(path, chunkSize):
+        for c in chunk:
+            duration = int(c[3])
+            for number in (c[0], c[1]):
+                total = totals.get(number, 0) + duration
+                totals[number] = total
+                top.update(number, total)
+
+    return totals, top
+
+
+if __name__ == '__main__':
+    import random
+
+    print('\nBEGIN TESTS')
+
+    # Test the leaderboard equals a stable sort of the final totals, ties by first appearance
+    rng = random.Random(0)
+    passed = True
+    for k in (1, 3, 10):
+        totals = {}
+        top = TopK(k)
+        for _ in range(500):
+            number = f'n{rng.randrange(40)}'
+            totals[number] = totals.get(number, 0) + rng.randrange(3)
+            top.update(number, totals[number])
+        expected = sorted(totals.items(), key=lambda m: -m[1])[:k]
+        passed = passed and top.leaderboard() == expected
+    print(f'Test 1 {"Passed" if passed else "Failed"}')
+
+    # Test a later number tying the lowest member does not displace it
+    top = TopK(2)
+    for number, total in [('b', 5), ('a', 7), ('c', 5)]:
+        top.update(number, total)
+    print(f'Test 2 {"Passed" if top.leaderboard() == [("a", 7), ("b", 5)] else "Failed"}')
+
+    # Test counts below 1 are rejected
+    try:
+        positiveInt('0')
+        passed = False
+    except argparse.ArgumentTypeError:
+        passed = True
+    print(f'Test 3 {"Passed" if passed else "Failed"}')
+
+    print('END TESTS\n')
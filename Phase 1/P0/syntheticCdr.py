@@ -0,0 +1,81 @@
+"""
+Synthetic calls.csv/texts.csv generator.
+
+Numbers use the same formats as the real records:
+ - fixed lines:   (0xx)xxxxxxxx, area code in brackets starting with 0
+ - mobiles:       xxxxx xxxxx, starting with 7, 8 or 9
+ - telemarketers: 140xxxxxxx, which only ever make outgoing calls
+
+Records are written in time order across one month, with CRLF line
+endings like the original files. Output is deterministic for a seed.
+
+Usage: python syntheticCdr.py <rows> [--out DIR] [--seed N]
+"""
+import argparse
+import csv
+import os
+import random
+
+AREA_CODES = ['(080)', '(022)', '(044)', '(040)', '(011)', '(0471)', '(0821)', '(04344)']
+MONTH_SECONDS = 30 * 24 * 3600
+
+
+def fixedLine(rng):
+    code = rng.choice(AREA_CODES)
+    return code + str(rng.randrange(10 ** (12 - len(code)), 10 ** (13 - len(code))))
+
+
+def mobile(rng):
+    digits = str(rng.choice('789')) + str(rng.randrange(10 ** 8, 10 ** 9))
+    return f'{digits[:5]} {digits[5:]}'
+
+
+def telemarketer(rng):
+    return '140' + str(rng.randrange(10 ** 6, 10 ** 7))
+
+
+def numberPool(rng, size):
+    # (people, telemarketers). Roughly 40% fixed, 58% mobile, 2% telemarketers.
+    people = [fixedLine(rng) if rng.random() < 0.4 else mobile(rng) for _ in range(size)]
+    telemarketers = [telemarketer(rng) for _ in range(max(1, size // 50))]
+    return people, telemarketers
+
+
+def timestamps(rng, rows):
+    # rows increasing 'dd-mm-yyyy HH:MM:SS' strings across September 2016.
+    # Sorted uniform times, drawn in order without holding them all: each is
+    # the minimum of the remaining uniforms above the previous one.
+    u = 0.0
+    for i in range(rows):
+        u = 1 - (1 - u) * rng.random() ** (1 / (rows - i))
+        second = min(int(u * MONTH_SECONDS), MONTH_SECONDS - 1)
+        day, rest = divmod(second, 24 * 3600)
+        hour, rest = divmod(rest, 3600)
+        minute, sec = divmod(rest, 60)
+        yield f'{day+1:02d}-09-2016 {hour:02d}:{minute:02d}:{sec:02d}'
+
+
+def generate(rows, out='.', seed=0):
+    rng = random.Random(seed)
+    people, telemarketers = numberPool(rng, max(10, rows // 10))
+
+    with open(os.path.join(out, 'calls.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        for when in timestamps(rng, rows):
+            caller = rng.choice(telemarketers) if rng.random() < 0.05 else rng.choice(people)
+            writer.writerow([caller, rng.choice(people), when, rng.randrange(1, 3600)])
+
+    with open(os.path.join(out, 'texts.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        for when in timestamps(rng, rows):
+            writer.writerow([rng.choice(people), rng.choice(people), when])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('rows', type=int)
+    parser.add_argument('--out', default='.')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    generate(args.rows, args.out, args.seed)
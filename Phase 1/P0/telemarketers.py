@@ -0,0 +1,47 @@
+"""
+Hash-set telemarketer detection.
+
+A possible telemarketer makes outgoing calls but never sends texts,
+receives texts or receives incoming calls.
+
+Callers are kept in one set, and every number seen sending a text,
+receiving a text or receiving a call is kept in another. The candidates
+are the set difference, so new batches of records can be added at any
+time and the answer stays correct.
+
+Complexity: O(n) to add n records, O(k) to get the k candidates.
+"""
+
+
+class TelemarketerDetector:
+
+    def __init__(self):
+        self.callers = set()
+        self.excluded = set()   # texters, text receivers and call receivers
+
+    def addCalls(self, calls):
+        # calls: iterable of (caller, receiver, ...) records
+        for c in calls:
+            self.callers.add(c[0])
+            self.excluded.add(c[1])
+
+    def addTexts(self, texts):
+        # texts: iterable of (sender, receiver, ...) records
+        for t in texts:
+            self.excluded.add(t[0])
+            self.excluded.add(t[1])
+
+    def merge(self, other):
+        # Combine with a detector built from another batch or shard
+        self.callers |= other.callers
+        self.excluded |= other.excluded
+
+    def candidates(self):
+        return self.callers - self.excluded
+
+
+def findTelemarketers(calls, texts):
+    detector = TelemarketerDetector()
+    detector.addCalls(calls)
+    detector.addTexts(texts)
+    return detector.candidates()
@@ -0,0 +1,126 @@
+"""
+Time-windowed queries over calls and texts.
+
+Records are ordered by their timestamp column. calls.csv and texts.csv
+are already in time order, in which case the columns are used as they
+are; otherwise a sorted permutation of record indices is built once.
+
+A window query binary-searches its bounds in the sorted timestamps and
+aggregates only the records in that slice.
+
+Complexity: O(log n + w) per query, for w records in the window.
+O(n log n) once if the records are not already in time order.
+
+Usage: python windows.py <hour|day|week> "<dd-mm-yyyy[ HH:MM:SS]>"
+"""
+import argparse
+import array
+import bisect
+import calendar
+import time
+
+import cdr
+from telemarketers import TelemarketerDetector
+
+WINDOW_SECONDS = {
+    'hour': 3600,
+    'day': 24 * 3600,
+    'week': 7 * 24 * 3600,
+}
+
+
+def parseTime(timeStr):
+    # 'dd-mm-yyyy' or 'dd-mm-yyyy HH:MM:SS' -> epoch seconds
+    timeFormat = cdr.TIME_FORMAT if ' ' in timeStr else '%d-%m-%Y'
+    return calendar.timegm(time.strptime(timeStr, timeFormat))
+
+
+def windowAt(unit, timeStr):
+    # (start, end) epoch bounds of the hour/day/week window starting at timeStr
+    start = parseTime(timeStr)
+    return start, start + WINDOW_SECONDS[unit]
+
+
+class TimeIndex:
+    """
+    Timestamps in ascending order, plus the record index of each one
+    (None when the records are already in time order).
+    """
+
+    def __init__(self, times):
+        if all(times[i] <= times[i+1] for i in range(len(times) - 1)):
+            self.order = None
+            self.times = times
+        else:
+            self.order = array.array('i', sorted(range(len(times)), key=times.__getitem__))
+            self.times = array.array('q', (times[i] for i in self.order))
+
+    def records(self, start, end):
+        # Record indices with start <= time < end
+        lo = bisect.bisect_left(self.times, start)
+        hi = bisect.bisect_left(self.times, end, lo)
+        if self.order is None:
+            return range(lo, hi)
+        return self.order[lo:hi]
+
+
+class WindowQueries:
+
+    def __init__(self, table):
+        self.table = table
+        self.calls = TimeIndex(table.callTime)
+        self.texts = TimeIndex(table.textTime)
+
+    def longestOnPhone(self, start, end):
+        # (number, seconds) with the most time on the phone, or None if no calls
+        t = self.table
+        totals = {}
+        for i in self.calls.records(start, end):
+            duration = t.callDuration[i]
+            totals[t.callCaller[i]] = totals.get(t.callCaller[i], 0) + duration
+            totals[t.callCallee[i]] = totals.get(t.callCallee[i], 0) + duration
+
+        if len(totals) == 0:
+            return None
+        key = max(totals, key=totals.get)
+        return t.numbers[key], totals[key]
+
+    def distinctNumbers(self, start, end):
+        t = self.table
+        numbers = set()
+        for i in self.calls.records(start, end):
+            numbers.add(t.callCaller[i])
+            numbers.add(t.callCallee[i])
+        for i in self.texts.records(start, end):
+            numbers.add(t.textSender[i])
+            numbers.add(t.textReceiver[i])
+        return len(numbers)
+
+    def telemarketers(self, start, end):
+        # Sorted numbers that only make outgoing calls within the window
+        t = self.table
+        detector = TelemarketerDetector()
+        detector.addCalls((t.callCaller[i], t.callCallee[i]) for i in self.calls.records(start, end))
+        detector.addTexts((t.textSender[i], t.textReceiver[i]) for i in self.texts.records(start, end))
+        return sorted(t.numbers[n] for n in detector.candidates())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('unit', choices=sorted(WINDOW_SECONDS))
+    parser.add_argument('start')
+    args = parser.parse_args()
+
+    start, end = windowAt(args.unit, args.start)
+    queries = WindowQueries(cdr.load())
+    period = f'{cdr.formatTime(start)} - {cdr.formatTime(end)}'
+
+    print(f'There are {queries.distinctNumbers(start, end)} different telephone numbers in {period}.')
+
+    longest = queries.longestOnPhone(start, end)
+    if longest is not None:
+        print(f'{longest[0]} spent the longest time, {longest[1]} seconds, on the phone during {period}.')
+
+    print('These numbers could be telemarketers: ')
+    for number in queries.telemarketers(start, end):
+        print(number)
@@ -1,29 +1,55 @@
-
 """
 For this problem we use a doubly linked list for maintaining a 'queue' of keys,
-such that the oldest key is always at the head of the list. 
+such that the oldest key is always at the head of the list.
+
+Cache items are stored in the list nodes, and a dictionary maps each key to its node.
+Complexity: O(1)
+
+If the key does not exist, a new node is prepended to the tail of the linked list,
+such that it is the 'youngest' key in the cache
+Complexity: O(1)
+
+If the key already exists, its node is found via the dictionary, unlinked from its
+neighbours and prepended back onto the tail of the list, thus making it 'youngest' again
+Complexity: O(1)
 
-Cache items are stored in a dictionary, and are accessed by any given key.
+If the cache is full, the oldest key is removed by popping the head of linked list
 Complexity: O(1)
 
-If the key does not exist, it is prepended to the tail of the linked list, such that
-it is the 'youngest' key in the cache
-Complexity: Worst case O(n) to check key exists, best case O(1)
+get_many() and set_many() handle a batch of keys in one call, O(1) per key.
+
+Hits, misses, inserts, updates, evictions and expirations are counted, and stats()
+returns them as a dictionary. With timed=True, get() and set() latencies are also
+recorded in histograms; otherwise no timing code runs at all.
 
-If the key already exists, it will be removed from the cache and prepended back onto 
-the tail of the list, thus making it 'youngest' again
-Complexity: Worst case O(n) as need to cycle through entries in removal process. Best case O(1)
+Entries can be given a time to live. An expired entry is removed when it is next
+accessed (O(1)), and expire() sweeps the whole cache every sweep_interval seconds (O(n)),
+so memory held by expired entries that are never accessed again is bounded.
 
-If the cache is full, the oldest key is removed by getting the head of linked list
-Complexity: Worst case O(n) to check and then remove key. Best case O(1)
+With max_weight, each entry is weighed by a sizer function (e.g. its size in bytes),
+and the oldest keys are popped from the head until the total weight fits the budget.
+Complexity: O(1) per evicted key
 
 """
 
+import sys
+import time
+
+STR_ENTRIES = 10
+
+
 class DoubleNode:
-    def __init__(self, value):
+    # Fixed attributes instead of a per-node __dict__, which saves memory per key
+    __slots__ = ('key', 'value', 'expires', 'weight', 'next', 'previous', 'list')
+
+    def __init__(self, key, value):
+        self.key = key
         self.value = value
+        self.expires = None     # clock time the entry expires at, None for never
+        self.weight = 0
         self.next = None
         self.previous = None
+        self.list = None        # owning list, used by problem_1_policies.py
 
 
 class DoublyLinkedList:
@@ -32,74 +58,75 @@ class DoublyLinkedList:
         self.head = None
         self.tail = None
         self.num_elements = 0
-    
+
     def size(self):
         return self.num_elements
 
-    def prepend(self, value):
-        
-        new_node = DoubleNode(value)
+    def prepend(self, key, value):
+        new_node = DoubleNode(key, value)
+        self.prepend_node(new_node)
+        return new_node
+
+    def prepend_node(self, node):
+        # Link node in at the tail ('youngest' end)
+        node.next = None
+        node.previous = self.tail
+
+        if self.tail is None:
+            self.head = node
+        else:
+            self.tail.next = node
+        self.tail = node
+
+        self.num_elements += 1
+
+    def append_head_node(self, node):
+        # Link node in at the head ('oldest' end)
+        node.previous = None
+        node.next = self.head
 
         if self.head is None:
-            self.head = new_node
-            self.tail = new_node
-        elif self.tail is None:
-            new_node.previous = self.head
-            self.head.next = new_node
-            self.tail = new_node
+            self.tail = node
         else:
-            self.tail.next = new_node
-            new_node.previous = self.tail
-            self.tail = new_node
+            self.head.previous = node
+        self.head = node
 
         self.num_elements += 1
-    
+
     def pop_head(self):
         if self.head is None:
             return None
         else:
-            val = self.head.value
-            new_head = self.head.next
-            self.head = new_head
-            self.num_elements -= 1
-            return val
-
-    def remove(self, value):
-        
-        if self.size() == 0:
-            pass
-
-        new_self = DoublyLinkedList()
-
-        loop_Node = self.head
-
-        while loop_Node is not None:
-            if loop_Node.value != value:
-                new_self.prepend(loop_Node.value)
-            loop_Node = loop_Node.next
-        
-        self.head = new_self.head
-        self.tail = new_self.tail
-        self.num_elements -= 1
+            node = self.head
+            self.remove_node(node)
+            return node
+
+    def remove_node(self, node):
+        # Unlink node from its neighbours. The node must be in this list.
+        if node.previous is None:
+            self.head = node.next
+        else:
+            node.previous.next = node.next
 
-    def contains(self, value):
-        if self.num_elements == 0:
-            return False
+        if node.next is None:
+            self.tail = node.previous
+        else:
+            node.next.previous = node.previous
 
-        check_Node = self.head
-        
-        while check_Node is not None:
-            if check_Node.value == value:
-                return True
-            check_Node = check_Node.next
+        node.next = None
+        node.previous = None
+        self.num_elements -= 1
 
-        return False
+    def move_to_tail(self, node):
+        if node is not self.tail:
+            self.remove_node(node)
+            self.prepend_node(node)
 
     def __str__(self) -> str:
         str = ''
         head_val = self.head
         while head_val is not None:
-            str += f'{head_val.value}, '
+            str += f'{head_val.key}, '
             head_val = head_val.next
         return str
 
@@ -107,52 +134,322 @@ class DoublyLinkedList:
 
 class LRU_Cache(object):
 
-    def __init__(self, capacity):
+    def __init__(self, capacity, ttl=None, max_weight=None, sizer=None,
+                 sweep_interval=None, clock=time.monotonic, timed=False, on_evict=None):
+        """
+        capacity:       maximum number of entries (None for no limit)
+        ttl:            default seconds before an entry expires (None for never)
+        max_weight:     maximum total weight of all entries (None for no limit)
+        sizer:          sizer(key, value) -> weight of an entry, default sys.getsizeof(value)
+        sweep_interval: seconds between sweeps for expired entries, default ttl or 60
+        timed:          record get/set latency histograms (see stats())
+        on_evict:       on_evict(key, value, expires) is called for every live entry evicted
+                        to make room, with the clock time it expires at (None for never)
+        """
         self.capacity = capacity
+        self.ttl = ttl
+        self.max_weight = max_weight
+        self.sizer = sizer or default_sizer
+        self.sweep_interval = sweep_interval or ttl or 60
+        self.clock = clock
+        self.on_evict = on_evict
+        self.total_weight = 0
+        self.expiring = 0   # number of entries with an expiry time
+        self.next_sweep = clock() + self.sweep_interval
         self.cache_keys = DoublyLinkedList()
-        self.cache = {}
-
-    def get(self, key):
-        if key == None or not self.cache_keys.contains(key):
-            return -1
+        self.cache = {}     # key -> DoubleNode
+        self.reset_stats()
+
+        self.get_latency = None
+        self.set_latency = None
+        if timed:
+            # Timing wrappers shadow the methods on this instance only, so an
+            # untimed cache pays nothing for them
+            self.get_latency = LatencyHistogram()
+            self.set_latency = LatencyHistogram()
+            self.get = timed_method(self.get, self.get_latency)
+            self.set = timed_method(self.set, self.set_latency)
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.inserts = 0
+        self.updates = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=-1):
+        """
+        default is returned on a miss, for callers whose values can be -1
+        """
+        node = self.cache.get(key)
+        if key == None or node is None:
+            self.misses += 1
+            return default
+        elif node.expires is not None and self.clock() >= node.expires:
+            # Lazy expiry: stale entries are removed when they are accessed
+            self.remove(node)
+            self.expirations += 1
+            self.misses += 1
+            return default
         else:
-            # Get value
-            val = self.cache[key]
-            # Then move key to tail, i.e. make it the 'youngest key'
-            self.cache_keys.remove(key)     
-            self.cache_keys.prepend(key)   
-            return val
-
-    def set(self, key, value):
-        if self.cache_keys.contains(key):
+            # Move key to tail, i.e. make it the 'youngest key'
+            self.cache_keys.move_to_tail(node)
+            self.hits += 1
+            return node.value
+
+    def set(self, key, value, ttl=None):
+        """
+        ttl overrides the cache's default time to live for this entry
+        """
+        if self.capacity is not None and self.capacity <= 0:
+            return
+
+        weight = self.sizer(key, value) if self.max_weight is not None else 0
+        if self.max_weight is not None and weight > self.max_weight:
+            # Entry could never fit. Drop any old value rather than keep it stale.
+            node = self.cache.get(key)
+            if node is not None:
+                self.remove(node)
+                self.evictions += 1
+            return
+
+        ttl = self.ttl if ttl is None else ttl
+        expires = None
+        if ttl is not None or self.expiring > 0:
+            now = self.clock()
+            if self.expiring > 0 and now >= self.next_sweep:
+                self.expire()
+            if ttl is not None:
+                expires = now + ttl
+
+        node = self.cache.get(key)
+        if node is not None:
             # Cache already has value with key
             # Replace cache item, then move key to tail (set as 'youngest')
-            self.cache[key] = value
-            self.cache_keys.remove(key)
-            self.cache_keys.prepend(key)
+            node.value = value
+            self.cache_keys.move_to_tail(node)
+            self.updates += 1
         else:
-            # New key item.
-            # First check if cache is full
-            if self.cache_keys.size() == self.capacity:
-                # Cache is full. Remove oldest key and corresponding cache value
-                oldest_key = self.cache_keys.pop_head()
-                del self.cache[oldest_key]
-                self.cache[key] = value
-                self.cache_keys.prepend(key)
-            else:
-                #Cache not full so just add new key
-                self.cache[key] = value
-                self.cache_keys.prepend(key)
+            # New key item
+            node = self.cache_keys.prepend(key, value)
+            self.cache[key] = node
+            self.inserts += 1
+
+        self.total_weight += weight - node.weight
+        node.weight = weight
+        self.expiring += (expires is not None) - (node.expires is not None)
+        node.expires = expires
+
+        # Remove oldest keys until the cache is within its capacity and weight budget
+        while ((self.capacity is not None and self.cache_keys.size() > self.capacity)
+               or (self.max_weight is not None and self.total_weight > self.max_weight)):
+            oldest = self.cache_keys.head
+            self.remove(oldest)
+            if oldest.expires is not None and self.clock() >= oldest.expires:
+                # Already stale: dropping it is an expiry, and nothing is handed on
+                self.expirations += 1
+                continue
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(oldest.key, oldest.value, oldest.expires)
+
+    def entries(self):
+        """
+        List of (key, value) from youngest to oldest. O(n)
+        """
+        items = []
+        node = self.cache_keys.tail
+        while node is not None:
+            items.append((node.key, node.value))
+            node = node.previous
+        return items
+
+    def restore(self, key, value):
+        """
+        Adds an entry as the oldest key, only if the key is absent and the cache has
+        room for it, so restored entries never evict or overwrite live ones.
+        Returns True if the entry was added.
+        """
+        if key == None or key in self.cache:
+            return False
+        if self.capacity is not None and self.cache_keys.size() >= self.capacity:
+            return False
+        weight = self.sizer(key, value) if self.max_weight is not None else 0
+        if self.max_weight is not None and self.total_weight + weight > self.max_weight:
+            return False
 
-    def __str__(self) -> str:
-        return f'LRU Cache Details:\nCache Dictionary {self.cache}\nCache Keys: {self.cache_keys}'
+        node = DoubleNode(key, value)
+        node.weight = weight
+        if self.ttl is not None:
+            node.expires = self.clock() + self.ttl
+            self.expiring += 1
+        self.cache_keys.append_head_node(node)
+        self.cache[key] = node
+        self.total_weight += weight
+        return True
+
+    def get_many(self, keys):
+        """
+        Looks up every key in one pass. Returns (dict of hits, list of missed keys),
+        so the misses can be fetched together and passed to set_many().
+        """
+        hits = {}
+        misses = []
+        cache = self.cache
+        move_to_tail = self.cache_keys.move_to_tail
+        now = None
+        hit_count = 0
+
+        for key in keys:
+            node = cache.get(key)
+            if key == None or node is None:
+                misses.append(key)
+                continue
+            if node.expires is not None:
+                if now is None:
+                    now = self.clock()
+                if now >= node.expires:
+                    self.remove(node)
+                    self.expirations += 1
+                    misses.append(key)
+                    continue
+            move_to_tail(node)
+            hits[key] = node.value
+            hit_count += 1
+
+        self.hits += hit_count
+        self.misses += len(misses)
+        return hits, misses
+
+    def set_many(self, items, ttl=None):
+        """
+        items: dictionary or iterable of (key, value) pairs
+        """
+        if isinstance(items, dict):
+            items = items.items()
+        for key, value in items:
+            self.set(key, value, ttl)
+
+    def remove(self, node):
+        self.cache_keys.remove_node(node)
+        del self.cache[node.key]
+        self.total_weight -= node.weight
+        if node.expires is not None:
+            self.expiring -= 1
+
+    def expire(self):
+        """
+        Sweeps the whole cache for expired entries. Returns the number removed.
+        """
+        now = self.clock()
+        self.next_sweep = now + self.sweep_interval
+        removed = 0
+        node = self.cache_keys.head
+        while node is not None:
+            next_node = node.next
+            if node.expires is not None and now >= node.expires:
+                self.remove(node)
+                removed += 1
+            node = next_node
+        self.expirations += removed
+        return removed
+
+    def stats(self):
+        """
+        Snapshot of the counters as a plain dictionary. O(1), or O(buckets) if timed.
+        """
+        snapshot = {
+            'size': len(self.cache),
+            'capacity': self.capacity,
+            'weight': self.total_weight,
+            'hits': self.hits,
+            'misses': self.misses,
+            'inserts': self.inserts,
+            'updates': self.updates,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+        if self.get_latency is not None:
+            snapshot['get_latency'] = self.get_latency.snapshot()
+            snapshot['set_latency'] = self.set_latency.snapshot()
+        return snapshot
 
+    def __str__(self) -> str:
+        # Only the oldest few entries are shown, so printing a large cache stays cheap
+        shown = []
+        node = self.cache_keys.head
+        while node is not None and len(shown) < STR_ENTRIES:
+            shown.append(f'{node.key!r}: {node.value!r}')
+            node = node.next
+        if len(self.cache) > STR_ENTRIES:
+            shown.append(f'... {len(self.cache) - STR_ENTRIES} more')
+        counters = ', '.join(f'{k}={v}' for k, v in self.stats().items() if not k.endswith('latency'))
+        return f'LRU Cache Details:\nCache Entries (oldest first): {{{", ".join(shown)}}}\nStats: {counters}'
+
+
+class LatencyHistogram(object):
+    """
+    Counts of latencies in power of two nanosecond buckets: bucket i holds
+    latencies below 2^i ns.
+    """
 
-def test_case(test_name, val, expected, cache: LRU_Cache):
-    if len(cache.cache) > cache.capacity:
+    def __init__(self):
+        self.buckets = [0] * 64
+        self.count = 0
+        self.total_ns = 0
+
+    def record(self, ns):
+        self.buckets[ns.bit_length()] += 1
+        self.count += 1
+        self.total_ns += ns
+
+    def merge(self, other):
+        for i, n in enumerate(other.buckets):
+            self.buckets[i] += n
+        self.count += other.count
+        self.total_ns += other.total_ns
+
+    def percentile(self, fraction):
+        # Upper bound in ns of the bucket holding the given fraction of samples
+        target = fraction * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n > 0 and seen >= target:
+                return 1 << i
+        return 0
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean_ns': self.total_ns / self.count if self.count else 0,
+            'p50_ns': self.percentile(0.5),
+            'p99_ns': self.percentile(0.99),
+            'buckets': {1 << i: n for i, n in enumerate(self.buckets) if n > 0},
+        }
+
+
+def timed_method(method, histogram):
+    def timed(*args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            histogram.record(time.perf_counter_ns() - start)
+    return timed
+
+
+def default_sizer(key, value):
+    return sys.getsizeof(value)
+
+
+def test_case(test_name, val, expected, cache: LRU_Cache = None):
+    # cache, if given, is also checked to be within its capacity
+    if cache is not None and cache.capacity is not None and len(cache.cache) > cache.capacity:
         print(f'Cache too large: ({len(cache.cache)})')
         pass
-    if cache.cache_keys.size() > cache.capacity:
+    if cache is not None and cache.capacity is not None and cache.cache_keys.size() > cache.capacity:
         print(f'Keys Cache too large: ({cache.cache_keys.size()})')
         pass
     if val == expected:
@@ -160,54 +457,113 @@ def test_case(test_name, val, expected, cache: LRU_Cache):
     else:
         print(f'{test_name} Failed')
 
-our_cache = LRU_Cache(5)
-
-our_cache.set(1, 1);
-our_cache.set(2, 2);
-our_cache.set(3, 3);
-our_cache.set(4, 4);
-
-our_cache.get(1)       # returns 1 and sets 1 as youngest key
-our_cache.get(2)       # returns 2 and sets 2 as youngest key
-our_cache.get(9)       
-
-our_cache.set(5, 5) 
-our_cache.set(6, 6)
-
-print('\nBEGIN TESTS')
-
-our_cache.get(3)      # Should return -1 because cache reached capacity; the '3' key was removed already
-test_case('Test 0',  our_cache.get(3), -1, our_cache)
-
-# Test get None
-test_case('Test 1',  our_cache.get(None), -1, our_cache)
-
-# Test get large value
-test_case('Test 2', our_cache.get(9999999999999999), -1, our_cache)
-
-# Test normal get
-our_cache.set(12, 87)
-test_case('Test 3', our_cache.get(12), 87, our_cache)
-
-# Test re-use of existing key
-our_cache.set(12, 99)
-test_case('Test 4', our_cache.get(12), 99, our_cache)
-
-# Test string key
-our_cache.set('err', 1)
-test_case('Test 5', our_cache.get('err'), 1, our_cache)
-
-
-# Test get value for key that is too old
-
-our_cache.set(10, 2) # <-- This should be too old, so expect -1 result
-our_cache.set('a', 3)
-our_cache.set('cow', 5)
-our_cache.set(2, 6)
-our_cache.set(1, 7)
-our_cache.set('ape', 9)
-test_case('Test 6', our_cache.get(10), -1, our_cache)
-
-print('END TESTS\n')
-print('Testing Complete\n')
-print(our_cache)
+if __name__ == '__main__':
+    our_cache = LRU_Cache(5)
+
+    our_cache.set(1, 1);
+    our_cache.set(2, 2);
+    our_cache.set(3, 3);
+    our_cache.set(4, 4);
+
+    our_cache.get(1)       # returns 1 and sets 1 as youngest key
+    our_cache.get(2)       # returns 2 and sets 2 as youngest key
+    our_cache.get(9)       
+
+    our_cache.set(5, 5) 
+    our_cache.set(6, 6)
+
+    print('\nBEGIN TESTS')
+
+    our_cache.get(3)      # Should return -1 because cache reached capacity; the '3' key was removed already
+    test_case('Test 0',  our_cache.get(3), -1, our_cache)
+
+    # Test get None
+    test_case('Test 1',  our_cache.get(None), -1, our_cache)
+
+    # Test get large value
+    test_case('Test 2', our_cache.get(9999999999999999), -1, our_cache)
+
+    # Test normal get
+    our_cache.set(12, 87)
+    test_case('Test 3', our_cache.get(12), 87, our_cache)
+
+    # Test re-use of existing key
+    our_cache.set(12, 99)
+    test_case('Test 4', our_cache.get(12), 99, our_cache)
+
+    # Test string key
+    our_cache.set('err', 1)
+    test_case('Test 5', our_cache.get('err'), 1, our_cache)
+
+
+    # Test get value for key that is too old
+
+    our_cache.set(10, 2) # <-- This should be too old, so expect -1 result
+    our_cache.set('a', 3)
+    our_cache.set('cow', 5)
+    our_cache.set(2, 6)
+    our_cache.set(1, 7)
+    our_cache.set('ape', 9)
+    test_case('Test 6', our_cache.get(10), -1, our_cache)
+
+    # Test zero capacity cache stores nothing
+    empty_cache = LRU_Cache(0)
+    empty_cache.set(1, 1)
+    test_case('Test 7', empty_cache.get(1), -1, empty_cache)
+
+    # Test recently used key survives eviction while the oldest is removed
+    small_cache = LRU_Cache(2)
+    small_cache.set('x', 1)
+    small_cache.set('y', 2)
+    small_cache.get('x')
+    small_cache.set('z', 3)
+    test_case('Test 8', (small_cache.get('x'), small_cache.get('y')), (1, -1), small_cache)
+
+    # Test entries expire after their time to live
+    now = [0]
+    ttl_cache = LRU_Cache(5, ttl=10, clock=lambda: now[0])
+    ttl_cache.set('a', 1)
+    ttl_cache.set('b', 2, ttl=100)
+    now[0] = 50
+    test_case('Test 9', (ttl_cache.get('a'), ttl_cache.get('b')), (-1, 2), ttl_cache)
+
+    # Test sweep removes expired entries without accessing them
+    now[0] = 200
+    test_case('Test 10', (ttl_cache.expire(), len(ttl_cache.cache)), (1, 0), ttl_cache)
+
+    # Test weighted eviction pops oldest keys until within budget
+    weight_cache = LRU_Cache(None, max_weight=10, sizer=lambda key, value: len(value))
+    weight_cache.set('a', 'xxxx')
+    weight_cache.set('b', 'xxxx')
+    weight_cache.set('c', 'xxxxxx')
+    test_case('Test 11', (weight_cache.get('a'), weight_cache.get('b'), weight_cache.total_weight), (-1, 'xxxx', 10), weight_cache)
+
+    # Test entry heavier than the whole budget is not cached
+    weight_cache.set('d', 'x' * 11)
+    test_case('Test 12', (weight_cache.get('d'), weight_cache.get('c')), (-1, 'xxxxxx'), weight_cache)
+
+    # Test counters
+    stats_cache = LRU_Cache(2, timed=True)
+    stats_cache.set(1, 1)
+    stats_cache.set(1, 2)
+    stats_cache.set(2, 2)
+    stats_cache.set(3, 3)
+    stats_cache.get(1)
+    stats_cache.get(3)
+    stats = stats_cache.stats()
+    counts = (stats['hits'], stats['misses'], stats['inserts'], stats['updates'], stats['evictions'])
+    test_case('Test 13', counts, (1, 1, 3, 1, 1), stats_cache)
+
+    # Test latency histograms count every call
+    test_case('Test 14', (stats['get_latency']['count'], stats['set_latency']['count']), (2, 4), stats_cache)
+
+    # Test batch get returns hits and misses, and updates recency
+    batch_cache = LRU_Cache(3)
+    batch_cache.set_many({'a': 1, 'b': 2, 'c': 3})
+    hits, misses = batch_cache.get_many(['a', 'x', 'b', None])
+    batch_cache.set_many([('d', 4)])
+    test_case('Test 15', (hits, misses, batch_cache.get('c')), ({'a': 1, 'b': 2}, ['x', None], -1), batch_cache)
+
+    print('END TESTS\n')
+    print('Testing Complete\n')
+    print(our_cache)
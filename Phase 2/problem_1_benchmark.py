@@ -0,0 +1,159 @@
+'''
+Benchmarks for the LRU cache in problem_1.py.
+
+Flat cost: for each cache size n, fills a cache of capacity n with n keys,
+then times random get() hits, set() updates of existing keys and set()
+inserts that each evict the oldest key. With O(1) operations the cost per
+operation should stay roughly the same from 1k to 10M entries.
+
+Concurrent (--concurrent): runs a mixed get/set workload from several threads
+against ShardedLRU_Cache (problem_1_concurrent.py) for each shard count, and
+reports total throughput.
+
+Memory (--memory): fills LRU_Cache (one slotted node object per key) and
+CompactLRU_Cache (problem_1_compact.py, array-backed links) with the same keys,
+and reports the memory traced by tracemalloc per entry.
+
+Usage: python problem_1_benchmark.py [--sizes 1000 10000 ...] [--ops N]
+       python problem_1_benchmark.py --concurrent [--threads T] [--shards 1 4 16 ...]
+       python problem_1_benchmark.py --memory [--sizes 1000 10000 ...]
+'''
+
+import argparse
+import random
+import threading
+import time
+import tracemalloc
+
+from problem_1 import LRU_Cache
+from problem_1_compact import CompactLRU_Cache
+from problem_1_concurrent import ShardedLRU_Cache
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000, 10000000]
+DEFAULT_SHARDS = [1, 2, 4, 8, 16, 32]
+
+
+def time_ops(operation, args):
+    start = time.perf_counter()
+    for a in args:
+        operation(a)
+    return (time.perf_counter() - start) / len(args) * 1e9
+
+
+def benchmark_flat(sizes, ops):
+    '''
+    Returns [(size, get ns/op, update ns/op, evicting set ns/op)]
+    '''
+    results = []
+    rng = random.Random(0)
+
+    for n in sizes:
+        cache = LRU_Cache(n)
+        for k in range(n):
+            cache.set(k, k)
+
+        keys = [rng.randrange(n) for _ in range(ops)]
+        get_ns = time_ops(cache.get, keys)
+        update_ns = time_ops(lambda k: cache.set(k, k), keys)
+        new_keys = range(n, n + ops)
+        insert_ns = time_ops(lambda k: cache.set(k, k), new_keys)
+
+        results.append((n, get_ns, update_ns, insert_ns))
+        print(f'{n:>10} entries: get {get_ns:7.0f} ns, update {update_ns:7.0f} ns, evicting set {insert_ns:7.0f} ns')
+
+    return results
+
+
+def print_flatness(results):
+    smallest, largest = results[0], results[-1]
+    for i, name in enumerate(['get', 'update', 'evicting set'], start=1):
+        print(f'{name}: {largest[i] / smallest[i]:.2f}x cost at {largest[0]} entries vs {smallest[0]}')
+
+
+def benchmark_concurrent(shard_counts, threads, ops, capacity, key_space):
+    '''
+    Returns [(shards, ops per second)]. Each thread does ops operations,
+    one set() for every four get() calls, on keys drawn from key_space.
+    '''
+    results = []
+
+    for shards in shard_counts:
+        cache = ShardedLRU_Cache(capacity, shards)
+        for k in range(capacity):
+            cache.set(k, k)
+
+        def worker(seed):
+            rng = random.Random(seed)
+            keys = [rng.randrange(key_space) for _ in range(ops)]
+            barrier.wait()
+            for i, k in enumerate(keys):
+                if i % 5 == 0:
+                    cache.set(k, i)
+                else:
+                    cache.get(k)
+
+        barrier = threading.Barrier(threads + 1)
+        workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+        for w in workers:
+            w.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for w in workers:
+            w.join()
+        throughput = threads * ops / (time.perf_counter() - start)
+
+        results.append((shards, throughput))
+        print(f'{shards:>4} shards, {threads} threads: {throughput:12.0f} ops/s')
+
+    return results
+
+
+def traced_bytes(build):
+    tracemalloc.start()
+    try:
+        cache = build()
+        return tracemalloc.get_traced_memory()[0], cache
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_memory(sizes):
+    '''
+    Returns [(size, LRU_Cache bytes per entry, CompactLRU_Cache bytes per entry)].
+    Keys are ints and values are all None, so only the cache structure differs.
+    '''
+    results = []
+
+    for n in sizes:
+        def fill(cache):
+            for k in range(n):
+                cache.set(k, None)
+            return cache
+
+        lru_bytes, _ = traced_bytes(lambda: fill(LRU_Cache(n)))
+        compact_bytes, _ = traced_bytes(lambda: fill(CompactLRU_Cache(n)))
+
+        results.append((n, lru_bytes / n, compact_bytes / n))
+        print(f'{n:>10} entries: LRU_Cache {lru_bytes / n:6.1f} B/entry, '
+              f'CompactLRU_Cache {compact_bytes / n:6.1f} B/entry ({compact_bytes / lru_bytes:.0%})')
+
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--ops', type=int, default=200000)
+    parser.add_argument('--concurrent', action='store_true')
+    parser.add_argument('--memory', action='store_true')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--shards', type=int, nargs='+', default=DEFAULT_SHARDS)
+    parser.add_argument('--capacity', type=int, default=100000)
+    args = parser.parse_args()
+
+    if args.memory:
+        benchmark_memory(args.sizes)
+    elif args.concurrent:
+        benchmark_concurrent(args.shards, args.threads, args.ops, args.capacity, args.capacity * 2)
+    else:
+        print_flatness(benchmark_flat(args.sizes, args.ops))
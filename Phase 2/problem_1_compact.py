@@ -0,0 +1,155 @@
+'''
+Memory-compact LRU cache using an array-backed intrusive linked list.
+
+Instead of one node object per key, every entry lives in a numbered slot.
+The links between slots are stored as integers in two preallocated arrays
+(previous and next slot index, -1 for none), and keys and values are stored
+in two preallocated lists, so the only per-entry objects are the dictionary
+entry mapping the key to its slot, and the key and value themselves.
+
+Slots are handed out in order until the cache is full. After that, the slot of
+the evicted oldest key is reused for the new key. Slots freed by delete() go on
+a free list and are reused first.
+
+The oldest key is at the head of the list and the youngest at the tail, as in
+problem_1.py.
+
+Complexity: O(1) for get(), set() and delete().
+Space: 2 x 4 bytes of links + 2 list references per slot, allocated up front.
+'''
+
+import array
+
+from problem_1 import test_case
+
+NIL = -1
+
+
+class CompactLRU_Cache(object):
+
+    def __init__(self, capacity):
+        self.capacity = max(0, capacity)
+        self.previous = array.array('i', [NIL]) * self.capacity
+        self.next = array.array('i', [NIL]) * self.capacity
+        self.keys = [None] * self.capacity
+        self.values = [None] * self.capacity
+        self.slots = {}             # key -> slot
+        self.free = array.array('i')
+        self.used = 0               # slots handed out so far
+        self.head = NIL
+        self.tail = NIL
+
+    def size(self):
+        return len(self.slots)
+
+    def unlink(self, slot):
+        previous, next_slot = self.previous[slot], self.next[slot]
+        if previous == NIL:
+            self.head = next_slot
+        else:
+            self.next[previous] = next_slot
+        if next_slot == NIL:
+            self.tail = previous
+        else:
+            self.previous[next_slot] = previous
+
+    def link_tail(self, slot):
+        self.previous[slot] = self.tail
+        self.next[slot] = NIL
+        if self.tail == NIL:
+            self.head = slot
+        else:
+            self.next[self.tail] = slot
+        self.tail = slot
+
+    def get(self, key, default=-1):
+        slot = self.slots.get(key)
+        if key == None or slot is None:
+            return default
+        if slot != self.tail:
+            self.unlink(slot)
+            self.link_tail(slot)
+        return self.values[slot]
+
+    def set(self, key, value):
+        if self.capacity == 0:
+            return
+        slot = self.slots.get(key)
+        if slot is not None:
+            self.values[slot] = value
+            if slot != self.tail:
+                self.unlink(slot)
+                self.link_tail(slot)
+            return
+
+        if self.free:
+            slot = self.free.pop()
+        elif self.used < self.capacity:
+            slot = self.used
+            self.used += 1
+        else:
+            # Full: reuse the oldest key's slot
+            slot = self.head
+            self.unlink(slot)
+            del self.slots[self.keys[slot]]
+
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.slots[key] = slot
+        self.link_tail(slot)
+
+    def delete(self, key):
+        slot = self.slots.pop(key, None)
+        if slot is None:
+            return False
+        self.unlink(slot)
+        self.keys[slot] = None
+        self.values[slot] = None
+        self.free.append(slot)
+        return True
+
+    def __str__(self) -> str:
+        shown = []
+        slot = self.head
+        while slot != NIL and len(shown) < 10:
+            shown.append(f'{self.keys[slot]!r}: {self.values[slot]!r}')
+            slot = self.next[slot]
+        return f'Compact LRU Cache Details:\nSize: {self.size()}/{self.capacity}\nOldest entries: {{{", ".join(shown)}}}'
+
+
+if __name__ == '__main__':
+    print('\nBEGIN TESTS')
+
+    our_cache = CompactLRU_Cache(3)
+
+    # Test normal get, missing key and None key
+    our_cache.set(1, 1)
+    passed = (our_cache.get(1), our_cache.get(2), our_cache.get(None)) == (1, -1, -1)
+    test_case('Test 1', passed, True)
+
+    # Test oldest key is evicted and its slot reused
+    our_cache.set(2, 2)
+    our_cache.set(3, 3)
+    our_cache.get(1)
+    our_cache.set(4, 4)
+    passed = (our_cache.get(2), our_cache.get(1), our_cache.get(4)) == (-1, 1, 4)
+    test_case('Test 2', passed, True)
+
+    # Test update keeps one slot per key
+    our_cache.set(4, 40)
+    passed = (our_cache.get(4), our_cache.size()) == (40, 3)
+    test_case('Test 3', passed, True)
+
+    # Test deleted slot is reused through the free list
+    our_cache.delete(3)
+    our_cache.set(5, 5)
+    passed = (our_cache.get(5), our_cache.get(1), our_cache.size(), our_cache.used) == (5, 1, 3, 3)
+    test_case('Test 4', passed, True)
+
+    # Test zero capacity cache stores nothing
+    empty_cache = CompactLRU_Cache(0)
+    empty_cache.set(1, 1)
+    test_case('Test 5', empty_cache.get(1), -1)
+
+    print('END TESTS\n')
+    print(our_cache)
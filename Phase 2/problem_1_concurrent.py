@@ -0,0 +1,210 @@
+'''
+Thread-safe LRU cache built from independently locked shards.
+
+Each key is assigned to one of N shards by its hash. Every shard is its own
+LRU_Cache (problem_1.py) guarded by its own lock, so threads working on keys in
+different shards never wait for each other.
+
+The total capacity, and max_weight if given, are split evenly between the
+shards (never more shards than capacity, so none is left empty), and each shard
+evicts its own oldest key.
+Eviction is therefore LRU within a shard, and only approximately LRU across the
+whole cache.
+
+Complexity: O(1) for get() and set(), plus any time spent waiting for the lock
+of the key's shard.
+'''
+
+import threading
+
+from problem_1 import LatencyHistogram, LRU_Cache, test_case
+
+
+def share(total, parts, i):
+    # Part i of total split as evenly as possible into parts (None stays None)
+    if total is None:
+        return None
+    return total // parts + (1 if i < total % parts else 0)
+
+
+class ShardedLRU_Cache(object):
+
+    def __init__(self, capacity, shards=16, **cache_options):
+        # cache_options are passed on to every shard's LRU_Cache
+        # except max_weight, which is split between the shards like capacity.
+        # No more shards than entries, so every shard can hold at least one
+        if capacity is not None:
+            shards = max(1, min(shards, capacity))
+        max_weight = cache_options.pop('max_weight', None)
+        self.capacity = capacity
+        self.max_weight = max_weight
+        self.num_shards = shards
+        self.shards = []
+        self.locks = []
+        for i in range(shards):
+            self.shards.append(LRU_Cache(share(capacity, shards, i), max_weight=share(max_weight, shards, i),
+                                         **cache_options))
+            self.locks.append(threading.Lock())
+
+    def shard_index(self, key):
+        return hash(key) % self.num_shards
+
+    def get(self, key, default=-1):
+        if key == None:
+            return default
+        i = self.shard_index(key)
+        with self.locks[i]:
+            return self.shards[i].get(key, default)
+
+    def set(self, key, value):
+        i = self.shard_index(key)
+        with self.locks[i]:
+            self.shards[i].set(key, value)
+
+    def get_many(self, keys):
+        """
+        Groups the keys by shard and takes each shard's lock once.
+        Returns (dict of hits, list of missed keys).
+        """
+        by_shard = {}
+        misses = []
+        for key in keys:
+            if key == None:
+                misses.append(key)
+            else:
+                by_shard.setdefault(self.shard_index(key), []).append(key)
+
+        hits = {}
+        for i, shard_keys in by_shard.items():
+            with self.locks[i]:
+                shard_hits, shard_misses = self.shards[i].get_many(shard_keys)
+            hits.update(shard_hits)
+            misses.extend(shard_misses)
+        return hits, misses
+
+    def set_many(self, items):
+        if isinstance(items, dict):
+            items = items.items()
+        by_shard = {}
+        for key, value in items:
+            by_shard.setdefault(self.shard_index(key), []).append((key, value))
+
+        for i, shard_items in by_shard.items():
+            with self.locks[i]:
+                self.shards[i].set_many(shard_items)
+
+    def entries(self):
+        """
+        (key, value) pairs, youngest first within each shard. Shards are
+        interleaved, as there is no recency order across shards.
+        """
+        per_shard = []
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                per_shard.append(shard.entries())
+        items = []
+        for i in range(max((len(e) for e in per_shard), default=0)):
+            for e in per_shard:
+                if i < len(e):
+                    items.append(e[i])
+        return items
+
+    def restore(self, key, value):
+        if key == None:
+            return False
+        i = self.shard_index(key)
+        with self.locks[i]:
+            return self.shards[i].restore(key, value)
+
+    def stats(self):
+        """
+        Counters summed over all shards. Each shard is read under its own lock,
+        so the snapshot is consistent per shard, not across shards.
+        """
+        totals = {}
+        latencies = {}
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                snapshot = shard.stats()
+                for name in ('get_latency', 'set_latency'):
+                    histogram = getattr(shard, name)
+                    if histogram is not None:
+                        latencies.setdefault(name, LatencyHistogram()).merge(histogram)
+            for name, value in snapshot.items():
+                if isinstance(value, (int, float)):
+                    totals[name] = totals.get(name, 0) + value
+        totals['capacity'] = self.capacity
+        for name, histogram in latencies.items():
+            totals[name] = histogram.snapshot()
+        return totals
+
+    def size(self):
+        return sum(len(shard.cache) for shard in self.shards)
+
+    def __str__(self) -> str:
+        sizes = [len(shard.cache) for shard in self.shards]
+        return f'Sharded LRU Cache Details:\nCapacity: {self.capacity}\nShard sizes: {sizes}'
+
+
+if __name__ == '__main__':
+    print('\nBEGIN TESTS')
+
+    our_cache = ShardedLRU_Cache(8, shards=4)
+
+    # Test normal get
+    our_cache.set(1, 1)
+    test_case('Test 1', our_cache.get(1), 1, our_cache.shards[our_cache.shard_index(1)])
+
+    # Test missing key and None key
+    test_case('Test 2', our_cache.get(2), -1, our_cache.shards[0])
+    test_case('Test 3', our_cache.get(None), -1, our_cache.shards[0])
+
+    # Test total size never exceeds capacity
+    for i in range(100):
+        our_cache.set(i, i)
+    test_case('Test 4', our_cache.size() <= our_cache.capacity, True, our_cache.shards[0])
+
+    # Test many threads leave every shard's list and dictionary consistent
+    def worker(seed):
+        for i in range(2000):
+            key = (seed * 7 + i) % 50
+            if i % 3 == 0:
+                our_cache.set(key, i)
+            else:
+                our_cache.get(key)
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    consistent = all(len(s.cache) == s.cache_keys.size() <= s.capacity for s in our_cache.shards)
+    test_case('Test 5', consistent, True, our_cache.shards[0])
+
+    # Test counters are summed over shards
+    stats = our_cache.stats()
+    gets = 2 + 8 * sum(1 for i in range(2000) if i % 3 != 0)
+    test_case('Test 6', stats['hits'] + stats['misses'], gets, our_cache.shards[0])
+
+    # Test batch operations across shards
+    batch_cache = ShardedLRU_Cache(100, shards=4)
+    batch_cache.set_many({k: k * 2 for k in range(10)})
+    hits, misses = batch_cache.get_many([1, 5, 'x', 9])
+    test_case('Test 7', (hits, misses), ({1: 2, 5: 10, 9: 18}, ['x']), batch_cache.shards[0])
+
+    # Test a capacity below the shard count keeps every key
+    small_cache = ShardedLRU_Cache(4)
+    small_cache.set_many({k: k for k in range(10, 14)})     # one key per shard
+    hits, misses = small_cache.get_many(range(10, 14))
+    test_case('Test 8', (small_cache.num_shards, len(hits)), (4, 4), small_cache.shards[0])
+
+    # Test max_weight is a budget for the whole cache, with or without a capacity
+    passed = True
+    for capacity in (1000, None):
+        weighted_cache = ShardedLRU_Cache(capacity, shards=16, max_weight=100, sizer=lambda k, v: 10)
+        weighted_cache.set_many({k: k for k in range(200)})
+        passed = passed and weighted_cache.size() <= 10
+    test_case('Test 9', passed, True, weighted_cache.shards[0])
+
+    print('END TESTS\n')
+    print(our_cache)
@@ -0,0 +1,221 @@
+'''
+Memoization decorator backed by LRU_Cache.
+
+    @memoize(capacity=1000)
+    def expensive(x, y=1): ...
+
+    @memoize(capacity=1000)
+    async def fetch(url): ...
+
+Arguments are turned into a hashable key (positional args, then keyword args
+sorted by name). Misses are detected with a private sentinel object rather
+than -1, so functions may return -1 (or None) and still be cached. Calls with
+unhashable arguments are passed straight through, uncached.
+
+Concurrent calls for the same key are coalesced: the first caller computes the
+value and every other caller waits for that result, so a cold key triggers
+exactly one computation. Exceptions are passed to every waiting caller and are
+not cached.
+
+ - Sync functions use a lock around the cache and one threading.Event per key
+   being computed.
+ - Async functions run the computation in one asyncio Task per key, which every
+   caller awaits through asyncio.shield(), so one caller being cancelled does
+   not cancel the computation for the others.
+
+Complexity: O(1) per call on top of the function itself, plus the cost of
+hashing the arguments.
+'''
+
+import asyncio
+import functools
+import inspect
+import threading
+
+from problem_1 import LRU_Cache, test_case
+
+_MISSING = object()
+_KWARGS_MARK = object()
+
+
+def make_key(args, kwargs):
+    if not kwargs:
+        return args
+    return args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+
+
+class _InFlight(object):
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+def memoize(capacity=128, **cache_options):
+    '''
+    cache_options are passed on to LRU_Cache (ttl, max_weight, sizer, ...)
+    '''
+    def decorator(func):
+        cache = LRU_Cache(capacity, **cache_options)
+        if inspect.iscoroutinefunction(func):
+            wrapper = _memoize_async(func, cache)
+        else:
+            wrapper = _memoize_sync(func, cache)
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+def _memoize_sync(func, cache):
+    lock = threading.Lock()
+    in_flight = {}
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = make_key(args, kwargs)
+        try:
+            hash(key)
+        except TypeError:
+            return func(*args, **kwargs)
+
+        with lock:
+            value = cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            call = in_flight.get(key)
+            owner = call is None
+            if owner:
+                call = in_flight[key] = _InFlight()
+
+        if not owner:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = func(*args, **kwargs)
+        except BaseException as error:
+            call.error = error
+            raise
+        else:
+            with lock:
+                cache.set(key, call.value)
+            return call.value
+        finally:
+            with lock:
+                del in_flight[key]
+            call.done.set()
+
+    return wrapper
+
+
+def _memoize_async(func, cache):
+    in_flight = {}
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        key = make_key(args, kwargs)
+        try:
+            hash(key)
+        except TypeError:
+            return await func(*args, **kwargs)
+
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        task = in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            in_flight[key] = task
+
+            def finished(task):
+                del in_flight[key]
+                if not task.cancelled() and task.exception() is None:
+                    cache.set(key, task.result())
+
+            task.add_done_callback(finished)
+
+        return await asyncio.shield(task)
+
+    return wrapper
+
+
+if __name__ == '__main__':
+    import time
+
+    print('\nBEGIN TESTS')
+
+    calls = []
+
+    @memoize(capacity=2)
+    def minus_one(x, offset=0):
+        calls.append(x)
+        return -1 + offset
+
+    # Test -1 results are cached
+    minus_one(1)
+    minus_one(1)
+    passed = minus_one(1) == -1 and calls == [1]
+    test_case('Test 1', passed, True)
+
+    # Test keyword arguments are part of the key
+    passed = minus_one(1, offset=5) == 4 and minus_one(1, offset=5) == 4 and calls == [1, 1]
+    test_case('Test 2', passed, True)
+
+    # Test unhashable arguments are not cached
+    passed = minus_one([1]) == -1 and minus_one([1]) == -1 and len(calls) == 4
+    test_case('Test 3', passed, True)
+
+    # Test concurrent threads compute a cold key once
+    slow_calls = []
+
+    @memoize()
+    def slow(x):
+        slow_calls.append(x)
+        time.sleep(0.1)
+        return x * 2
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(slow(21))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    passed = results == [42] * 8 and slow_calls == [21]
+    test_case('Test 4', passed, True)
+
+    # Test exceptions reach the caller and are not cached
+    failures = []
+
+    @memoize()
+    def fails(x):
+        failures.append(x)
+        raise ValueError(x)
+
+    for _ in range(2):
+        try:
+            fails(1)
+        except ValueError:
+            pass
+    test_case('Test 5', failures, [1, 1])
+
+    # Test concurrent async calls compute a cold key once
+    async_calls = []
+
+    @memoize()
+    async def fetch(x):
+        async_calls.append(x)
+        await asyncio.sleep(0.1)
+        return -1
+
+    async def run_async():
+        results = await asyncio.gather(*[fetch('a') for _ in range(8)])
+        return results + [await fetch('a')]
+
+    passed = asyncio.run(run_async()) == [-1] * 9 and async_calls == ['a']
+    test_case('Test 6', passed, True)
+
+    print('END TESTS\n')
@@ -0,0 +1,360 @@
+'''
+Scan-resistant eviction policies with the same get/set interface as LRU_Cache.
+
+Pure LRU admits every new key as the 'youngest', so one pass over many keys that
+are used only once (a scan) pushes every frequently used key out of the cache.
+Each policy below keeps keys seen once apart from keys seen more than once:
+
+2Q:
+    New keys enter a small FIFO queue (A1in). Keys evicted from it are remembered,
+    without their values, in a ghost queue (A1out). Only a key set again while it
+    is in A1out is admitted to the main LRU list (Am).
+
+ARC (Adaptive Replacement Cache):
+    T1 holds keys seen once recently, T2 keys seen at least twice. Ghost lists B1
+    and B2 remember keys recently evicted from each. A ghost hit in B1 grows the
+    target size p of T1, a ghost hit in B2 shrinks it, so the split between
+    recency and frequency adapts to the workload.
+
+W-TinyLFU:
+    New keys enter a small LRU window. A key leaving the window is only admitted to
+    the main segmented LRU (probation + protected) if a count-min sketch estimates
+    it has been used more often than the key it would replace. The sketch halves
+    all its counters periodically so old popularity fades.
+
+Complexity: O(1) for get() and set() in every policy.
+
+Trace replay: python problem_1_policies.py --trace FILE [--capacity N]
+replays a file of keys (one per line) through every policy and prints each
+policy's hit ratio. Every miss is followed by a set() of the key.
+'''
+
+import argparse
+
+from problem_1 import DoublyLinkedList, LRU_Cache, test_case
+
+
+class _Lists(object):
+    '''
+    Key -> node map shared by several DoublyLinkedLists. Each node records the
+    list it is in, so moving a key between lists is O(1).
+    '''
+
+    def __init__(self):
+        self.nodes = {}
+
+    def find(self, key):
+        return self.nodes.get(key)
+
+    def add(self, key, value, to_list):
+        node = to_list.prepend(key, value)
+        node.list = to_list
+        self.nodes[key] = node
+        return node
+
+    def remove(self, node):
+        node.list.remove_node(node)
+        del self.nodes[node.key]
+
+    def move(self, node, to_list):
+        node.list.remove_node(node)
+        to_list.prepend_node(node)
+        node.list = to_list
+
+    def pop_head(self, from_list):
+        node = from_list.pop_head()
+        del self.nodes[node.key]
+        return node
+
+
+class TwoQ_Cache(object):
+
+    def __init__(self, capacity, in_ratio=0.25, out_ratio=0.5):
+        self.capacity = capacity
+        self.in_capacity = max(1, int(capacity * in_ratio))
+        self.out_capacity = max(1, int(capacity * out_ratio))
+        self.a1_in = DoublyLinkedList()     # FIFO of keys seen once
+        self.a1_out = DoublyLinkedList()    # ghost keys evicted from a1_in
+        self.am = DoublyLinkedList()        # LRU of keys seen again
+        self.lists = _Lists()
+
+    def get(self, key):
+        node = self.lists.find(key)
+        if key == None or node is None or node.list is self.a1_out:
+            return -1
+        if node.list is self.am:
+            self.am.move_to_tail(node)
+        # Keys in a1_in keep their FIFO position
+        return node.value
+
+    def set(self, key, value):
+        if self.capacity <= 0:
+            return
+        node = self.lists.find(key)
+        if node is not None and node.list is not self.a1_out:
+            node.value = value
+            if node.list is self.am:
+                self.am.move_to_tail(node)
+            return
+
+        if node is not None:
+            # Seen again soon after leaving a1_in: admit to the main list
+            self.lists.remove(node)
+            self.reclaim()
+            self.lists.add(key, value, self.am)
+        else:
+            self.reclaim()
+            self.lists.add(key, value, self.a1_in)
+
+    def reclaim(self):
+        if self.a1_in.size() + self.am.size() < self.capacity:
+            return
+        if self.a1_in.size() > self.in_capacity or self.am.size() == 0:
+            oldest = self.lists.pop_head(self.a1_in)
+            self.lists.add(oldest.key, None, self.a1_out)
+            if self.a1_out.size() > self.out_capacity:
+                self.lists.pop_head(self.a1_out)
+        else:
+            self.lists.pop_head(self.am)
+
+
+class ARC_Cache(object):
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.p = 0                      # target size of t1
+        self.t1 = DoublyLinkedList()    # resident, seen once
+        self.t2 = DoublyLinkedList()    # resident, seen at least twice
+        self.b1 = DoublyLinkedList()    # ghosts evicted from t1
+        self.b2 = DoublyLinkedList()    # ghosts evicted from t2
+        self.lists = _Lists()
+
+    def get(self, key):
+        node = self.lists.find(key)
+        if key == None or node is None or node.list is self.b1 or node.list is self.b2:
+            return -1
+        self.lists.move(node, self.t2)
+        return node.value
+
+    def set(self, key, value):
+        if self.capacity <= 0:
+            return
+        c = self.capacity
+        node = self.lists.find(key)
+
+        if node is not None and (node.list is self.t1 or node.list is self.t2):
+            node.value = value
+            self.lists.move(node, self.t2)
+        elif node is not None and node.list is self.b1:
+            self.p = min(c, self.p + max(self.b2.size() // self.b1.size(), 1))
+            self.replace(False)
+            self.lists.remove(node)
+            self.lists.add(key, value, self.t2)
+        elif node is not None and node.list is self.b2:
+            self.p = max(0, self.p - max(self.b1.size() // self.b2.size(), 1))
+            self.replace(True)
+            self.lists.remove(node)
+            self.lists.add(key, value, self.t2)
+        else:
+            l1 = self.t1.size() + self.b1.size()
+            total = l1 + self.t2.size() + self.b2.size()
+            if l1 >= c:
+                if self.t1.size() < c:
+                    self.lists.pop_head(self.b1)
+                    self.replace(False)
+                else:
+                    self.lists.pop_head(self.t1)
+            elif total >= c:
+                if total >= 2 * c:
+                    self.lists.pop_head(self.b2)
+                self.replace(False)
+            self.lists.add(key, value, self.t1)
+
+    def replace(self, in_b2):
+        # Make room for one entry by moving the head of t1 or t2 to its ghost list
+        if self.t1.size() + self.t2.size() < self.capacity:
+            return
+        t1_size = self.t1.size()
+        if t1_size > 0 and (t1_size > self.p or (in_b2 and t1_size == self.p)):
+            oldest = self.lists.pop_head(self.t1)
+            self.lists.add(oldest.key, None, self.b1)
+        else:
+            oldest = self.lists.pop_head(self.t2)
+            self.lists.add(oldest.key, None, self.b2)
+
+
+class CountMinSketch(object):
+    '''
+    Approximate use counts in depth rows of small saturating counters. The
+    estimate is the minimum over the rows, so collisions can only overestimate.
+    After sample_size increments every counter is halved (aging).
+    '''
+
+    MAX_COUNT = 15
+
+    def __init__(self, width, depth=4, sample_size=None):
+        self.width = 1
+        while self.width < width:
+            self.width *= 2
+        self.mask = self.width - 1
+        self.depth = depth
+        self.rows = [bytearray(self.width) for _ in range(depth)]
+        self.sample_size = sample_size or 10 * width
+        self.additions = 0
+
+    def indexes(self, key):
+        h = hash(key)
+        for i in range(self.depth):
+            h = hash((h, i))
+            yield h & self.mask
+
+    def increment(self, key):
+        for row, i in zip(self.rows, self.indexes(key)):
+            if row[i] < self.MAX_COUNT:
+                row[i] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.age()
+
+    def estimate(self, key):
+        return min(row[i] for row, i in zip(self.rows, self.indexes(key)))
+
+    def age(self):
+        self.additions //= 2
+        self.rows = [bytearray(c >> 1 for c in row) for row in self.rows]
+
+
+class TinyLFU_Cache(object):
+
+    def __init__(self, capacity, window_ratio=0.01, protected_ratio=0.8):
+        self.capacity = capacity
+        self.window_capacity = max(1, int(capacity * window_ratio))
+        self.main_capacity = max(0, capacity - self.window_capacity)
+        self.protected_capacity = int(self.main_capacity * protected_ratio)
+        self.window = DoublyLinkedList()
+        self.probation = DoublyLinkedList()
+        self.protected = DoublyLinkedList()
+        self.lists = _Lists()
+        self.sketch = CountMinSketch(max(capacity, 16))
+
+    def get(self, key):
+        if key == None:
+            return -1
+        self.sketch.increment(key)
+        node = self.lists.find(key)
+        if node is None:
+            return -1
+        self.touch(node)
+        return node.value
+
+    def set(self, key, value):
+        if self.capacity <= 0:
+            return
+        self.sketch.increment(key)
+        node = self.lists.find(key)
+        if node is not None:
+            node.value = value
+            self.touch(node)
+            return
+
+        self.lists.add(key, value, self.window)
+        if self.window.size() > self.window_capacity:
+            self.admit(self.lists.pop_head(self.window))
+
+    def touch(self, node):
+        if node.list is self.probation:
+            # Used again while on probation: promote to protected
+            self.lists.move(node, self.protected)
+            if self.protected.size() > self.protected_capacity:
+                self.lists.move(self.protected.head, self.probation)
+        else:
+            node.list.move_to_tail(node)
+
+    def admit(self, candidate):
+        # candidate has left the window. Admit it to the main cache if it is
+        # used more often than the key it would evict.
+        if self.main_capacity == 0:
+            return
+        if self.probation.size() + self.protected.size() >= self.main_capacity:
+            victim = self.probation.head or self.protected.head
+            if self.sketch.estimate(candidate.key) <= self.sketch.estimate(victim.key):
+                return
+            self.lists.remove(victim)
+        self.lists.add(candidate.key, candidate.value, self.probation)
+
+
+POLICIES = {
+    'LRU': LRU_Cache,
+    '2Q': TwoQ_Cache,
+    'ARC': ARC_Cache,
+    'W-TinyLFU': TinyLFU_Cache,
+}
+
+
+def replay(trace, capacity, policies=POLICIES):
+    '''
+    Returns {policy name: hit ratio} for the list of keys in trace
+    '''
+    results = {}
+    for name, policy in policies.items():
+        cache = policy(capacity)
+        hits = 0
+        for key in trace:
+            if cache.get(key) != -1:
+                hits += 1
+            else:
+                cache.set(key, key)
+        results[name] = hits / len(trace) if trace else 0.0
+    return results
+
+
+def read_trace(path):
+    with open(path, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def print_replay(results):
+    for name, ratio in results.items():
+        print(f'{name:>10}: {100 * ratio:6.2f}% hits')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--trace')
+    parser.add_argument('--capacity', type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.trace:
+        print_replay(replay(read_trace(args.trace), args.capacity))
+    else:
+        print('\nBEGIN TESTS')
+
+        for number, (name, policy) in enumerate(POLICIES.items()):
+            our_cache = policy(4)
+            our_cache.set(1, 'one')
+            our_cache.set(1, 'uno')
+            passed = (our_cache.get(1), our_cache.get(2), our_cache.get(None)) == ('uno', -1, -1)
+
+            # Never holds more than its capacity
+            for i in range(100):
+                our_cache.set(i, i)
+                our_cache.get(i // 2)
+            resident = [k for k in range(100) if our_cache.get(k) != -1]
+            passed = passed and len(resident) <= 4
+            test_case(f'Test {number} ({name})', passed, True)
+
+        # Test scans do not flush the hot keys: hot keys are used repeatedly
+        # among keys used once, interrupted by long passes over keys used once
+        hot = list(range(50))
+        once = iter(range(1000, 1000000))
+        trace = []
+        for _ in range(10):
+            for _ in range(5):
+                trace += hot + [next(once) for _ in range(50)]
+            trace += [next(once) for _ in range(500)]
+        results = replay(trace, 100)
+        print_replay(results)
+        passed = all(results[name] > results['LRU'] for name in ['2Q', 'ARC', 'W-TinyLFU'])
+        test_case('Test 4', passed, True)
+
+        print('END TESTS\n')
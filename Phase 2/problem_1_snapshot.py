@@ -0,0 +1,171 @@
+'''
+Warm-start snapshots for LRU_Cache and ShardedLRU_Cache.
+
+A snapshot file holds the cache's keys and values from youngest to oldest, as
+a header followed by pickled batches of entries.
+
+Saving:
+    The entries are copied while holding the cache's lock (O(n), no pickling),
+    then pickled and written by a background thread. The file is written to a
+    temporary name and renamed over the old snapshot, so a crash mid-write never
+    leaves a partial snapshot behind, and a failed write removes its temporary
+    file. The writer is not a daemon thread, so a program that saves a snapshot
+    as it shuts down still finishes writing it before the interpreter exits.
+
+Restoring:
+    A background thread reads the snapshot a batch at a time and adds each
+    entry as the oldest key, only if the key is not in the cache already and
+    there is room (see LRU_Cache.restore). The cache serves requests while the
+    restore runs: live entries are never evicted or overwritten by restored
+    ones, and entries restored youngest-first keep their recency order.
+
+Entry expiry times are not saved. Restored entries get the cache's default
+time to live from the moment they are restored.
+
+Pass the same lock used around the cache by the rest of the program. A
+ShardedLRU_Cache locks its own shards, so no lock is needed for one.
+
+Complexity: O(n) to save or restore n entries.
+'''
+
+import os
+import pickle
+import threading
+from contextlib import nullcontext
+
+MAGIC = b'LRUSNAP1'
+BATCH_SIZE = 1000
+
+
+def write_snapshot(entries, path):
+    '''
+    Writes [(key, value)] (youngest first) to path atomically
+    '''
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(MAGIC)
+            for i in range(0, len(entries), BATCH_SIZE):
+                pickle.dump(entries[i:i + BATCH_SIZE], f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_snapshot(path):
+    '''
+    Yields batches of (key, value) pairs, youngest first
+    '''
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} is not an LRU cache snapshot')
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def save_snapshot(cache, path, lock=None, background=True):
+    '''
+    Returns the writer thread if background, otherwise None once written.
+    The writer thread is not a daemon, so the interpreter waits for it at exit.
+    '''
+    with lock or nullcontext():
+        entries = cache.entries()
+
+    if not background:
+        write_snapshot(entries, path)
+        return None
+    thread = threading.Thread(target=write_snapshot, args=(entries, path))
+    thread.start()
+    return thread
+
+
+def restore_snapshot(cache, path, lock=None, background=True):
+    '''
+    Returns the restoring thread if background, otherwise the number of entries restored.
+    A missing snapshot file restores nothing.
+    '''
+    def restore():
+        restored = 0
+        if not os.path.exists(path):
+            return restored
+        for batch in read_snapshot(path):
+            # Lock per batch, so requests are only held up for one batch at a time
+            with lock or nullcontext():
+                for key, value in batch:
+                    restored += cache.restore(key, value)
+        return restored
+
+    if not background:
+        return restore()
+    thread = threading.Thread(target=restore, daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    from problem_1 import LRU_Cache, test_case
+    from problem_1_concurrent import ShardedLRU_Cache
+
+    print('\nBEGIN TESTS')
+    path = os.path.join(tempfile.mkdtemp(), 'cache.snapshot')
+
+    # Test entries come back with their recency order
+    our_cache = LRU_Cache(3)
+    for k in range(5):
+        our_cache.set(k, k * 10)
+    our_cache.get(2)
+    save_snapshot(our_cache, path).join()
+
+    restored_cache = LRU_Cache(3)
+    restore_snapshot(restored_cache, path).join()
+    passed = restored_cache.entries() == our_cache.entries() == [(2, 20), (4, 40), (3, 30)]
+    test_case('Test 1', passed, True, restored_cache)
+
+    # Test restored entries never replace or evict live entries
+    live_cache = LRU_Cache(3)
+    live_cache.set(4, 'live')
+    restored = restore_snapshot(live_cache, path, background=False)
+    passed = restored == 2 and live_cache.entries() == [(4, 'live'), (2, 20), (3, 30)]
+    test_case('Test 2', passed, True, live_cache)
+
+    # Test sharded caches restore while serving requests
+    sharded_cache = ShardedLRU_Cache(100, shards=4)
+    for k in range(100):
+        sharded_cache.set(k, k)
+    save_snapshot(sharded_cache, path, background=False)
+    new_cache = ShardedLRU_Cache(100, shards=4)
+    thread = restore_snapshot(new_cache, path)
+    new_cache.set('fresh', 1)
+    thread.join()
+    passed = new_cache.get('fresh') == 1 and new_cache.get(50) == 50 and new_cache.size() == 100
+    test_case('Test 3', passed, True)
+
+    # Test missing snapshot restores nothing
+    passed = restore_snapshot(LRU_Cache(3), path + '.missing', background=False) == 0
+    test_case('Test 4', passed, True)
+
+    # Test the writer outlives the main thread, and a failed write leaves no temp file
+    writer = save_snapshot(our_cache, path)
+    passed = not writer.daemon
+    writer.join()
+    bad_cache = LRU_Cache(2)
+    bad_cache.set('lock', threading.Lock())
+    try:
+        save_snapshot(bad_cache, path, background=False)
+        passed = False
+    except TypeError:
+        passed = passed and not [n for n in os.listdir(os.path.dirname(path)) if n.endswith('.tmp')]
+    test_case('Test 5', passed, True)
+
+    print('END TESTS\n')
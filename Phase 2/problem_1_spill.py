@@ -0,0 +1,251 @@
+'''
+Two-tier LRU cache: entries evicted from memory spill to a memory-mapped file.
+
+DiskSegmentStore:
+    A file of fixed-size slots, memory-mapped. Each slot holds one pickled value
+    with a 4 byte length in front. An in-memory dictionary maps keys to list
+    nodes holding their slot number, and the list keeps the keys in LRU order
+    (as in problem_1.py). When every slot is used, the oldest key's slot is
+    reused. Values that do not fit in a slot, or cannot be pickled, are not
+    stored. Each node also keeps its entry's expiry time, and an expired entry
+    is treated as missing.
+    The index is kept in memory only, so the store starts empty on every run.
+
+TwoTierLRU_Cache:
+    An LRU_Cache in memory whose evicted entries are put into the disk store.
+    A miss in memory checks the disk store before returning a miss, and a disk
+    hit moves the entry back into memory (which may spill another entry), with
+    whatever time it had left to live.
+
+Complexity: O(1) for get() and set(), plus pickling and copying the value when
+it moves between memory and disk.
+Space: at most capacity entries in memory, and slots * slot_size bytes on disk.
+'''
+
+import mmap
+import os
+import pickle
+import struct
+import time
+
+from problem_1 import DoublyLinkedList, LRU_Cache, test_case
+
+LENGTH = struct.Struct('<I')
+_MISSING = object()
+
+
+class DiskSegmentStore(object):
+
+    def __init__(self, path, slots, slot_size=4096, clock=time.monotonic):
+        self.path = path
+        self.clock = clock
+        self.num_slots = slots
+        self.slot_size = slot_size
+        self.free = list(range(slots - 1, -1, -1))
+        self.keys = DoublyLinkedList()      # node.value is the key's slot, node.expires its expiry
+        self.index = {}                     # key -> DoubleNode
+
+        with open(path, 'wb') as f:
+            f.truncate(slots * slot_size)
+        self.file = open(path, 'r+b')
+        self.map = mmap.mmap(self.file.fileno(), slots * slot_size) if slots > 0 else None
+
+    def size(self):
+        return len(self.index)
+
+    def put(self, key, value, expires=None):
+        '''
+        expires is the clock time the entry expires at (None for never).
+        Returns False if the value cannot be pickled or is too large for a slot
+        '''
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError, RecursionError):
+            self.discard(key)
+            return False
+        if self.num_slots == 0 or LENGTH.size + len(data) > self.slot_size:
+            self.discard(key)
+            return False
+
+        node = self.index.get(key)
+        if node is not None:
+            self.keys.move_to_tail(node)
+        else:
+            if self.free:
+                slot = self.free.pop()
+            else:
+                # Full: reuse the oldest key's slot
+                oldest = self.keys.pop_head()
+                del self.index[oldest.key]
+                slot = oldest.value
+            node = self.index[key] = self.keys.prepend(key, slot)
+        node.expires = expires
+
+        offset = node.value * self.slot_size
+        LENGTH.pack_into(self.map, offset, len(data))
+        self.map[offset + LENGTH.size:offset + LENGTH.size + len(data)] = data
+        return True
+
+    def read(self, slot):
+        offset = slot * self.slot_size
+        (length,) = LENGTH.unpack_from(self.map, offset)
+        return pickle.loads(self.map[offset + LENGTH.size:offset + LENGTH.size + length])
+
+    def live_node(self, key):
+        '''
+        The key's node, or None if it is absent or expired (expired keys are discarded)
+        '''
+        node = self.index.get(key)
+        if node is not None and node.expires is not None and self.clock() >= node.expires:
+            self.discard(key)
+            return None
+        return node
+
+    def get(self, key, default=None):
+        node = self.live_node(key)
+        if node is None:
+            return default
+        self.keys.move_to_tail(node)
+        return self.read(node.value)
+
+    def pop(self, key, default=None):
+        '''
+        Removes the key and returns (value, expires)
+        '''
+        node = self.live_node(key)
+        if node is None:
+            return default
+        value = self.read(node.value)
+        self.discard(key)
+        return value, node.expires
+
+    def discard(self, key):
+        node = self.index.pop(key, None)
+        if node is not None:
+            self.keys.remove_node(node)
+            self.free.append(node.value)
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
+
+
+class TwoTierLRU_Cache(object):
+
+    def __init__(self, capacity, disk_path, disk_slots, slot_size=4096, **cache_options):
+        # cache_options are passed on to the in-memory LRU_Cache
+        clock = cache_options.get('clock', time.monotonic)
+        self.disk = DiskSegmentStore(disk_path, disk_slots, slot_size, clock)
+        self.memory = LRU_Cache(capacity, on_evict=self.disk.put, **cache_options)
+        self.disk_hits = 0
+
+    def get(self, key, default=-1):
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if key == None:
+            return default
+
+        entry = self.disk.pop(key, _MISSING)
+        if entry is _MISSING:
+            return default
+        # Promote back into memory, keeping the time it had left
+        value, expires = entry
+        self.disk_hits += 1
+        if expires is None:
+            self.memory.set(key, value)
+        else:
+            self.memory.set(key, value, ttl=expires - self.disk.clock())
+        return value
+
+    def set(self, key, value):
+        # Any copy on disk is now stale
+        self.disk.discard(key)
+        self.memory.set(key, value)
+
+    def stats(self):
+        snapshot = self.memory.stats()
+        snapshot['disk_size'] = self.disk.size()
+        snapshot['disk_hits'] = self.disk_hits
+        return snapshot
+
+    def close(self):
+        self.disk.close()
+
+    def __str__(self) -> str:
+        return f'Two Tier LRU Cache Details:\nMemory: {len(self.memory.cache)}/{self.memory.capacity}\nDisk: {self.disk.size()}/{self.disk.num_slots}'
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    print('\nBEGIN TESTS')
+    path = os.path.join(tempfile.mkdtemp(), 'spill.bin')
+
+    our_cache = TwoTierLRU_Cache(2, path, disk_slots=2, slot_size=64)
+    for k in range(4):
+        our_cache.set(k, f'value {k}')
+
+    # Test evicted entries are found on disk and promoted
+    passed = (our_cache.get(0), len(our_cache.memory.cache), our_cache.disk_hits) == ('value 0', 2, 1)
+    test_case('Test 1', passed, True, our_cache.memory)
+
+    # Test the disk tier is bounded and drops its own oldest key
+    for k in range(4, 8):
+        our_cache.set(k, f'value {k}')
+    passed = our_cache.disk.size() == 2 and our_cache.get(1) == -1
+    test_case('Test 2', passed, True, our_cache.memory)
+
+    # Test values too large for a slot are not spilled
+    our_cache.set('big', 'x' * 100)
+    our_cache.set('a', 1)
+    our_cache.set('b', 2)
+    passed = our_cache.get('big') == -1
+    test_case('Test 3', passed, True, our_cache.memory)
+
+    # Test set replaces a stale disk copy
+    our_cache.set('c', 3)
+    our_cache.set('a', 'new')
+    passed = our_cache.get('a') == 'new'
+    test_case('Test 4', passed, True, our_cache.memory)
+
+    # Test None key and missing key
+    passed = (our_cache.get(None), our_cache.get('missing')) == (-1, -1)
+    test_case('Test 5', passed, True, our_cache.memory)
+
+    # Test entries that expired in memory are not spilled and served again
+    now = [0]
+    ttl_cache = TwoTierLRU_Cache(2, path + '.ttl', 4, ttl=10, sweep_interval=1000, clock=lambda: now[0])
+    ttl_cache.set('a', 1)
+    now[0] = 20
+    ttl_cache.set('b', 2)
+    ttl_cache.set('c', 3)
+    passed = (ttl_cache.get('a'), ttl_cache.disk.size(), ttl_cache.memory.expirations) == (-1, 0, 1)
+    test_case('Test 6', passed, True)
+
+    # Test a spilled entry keeps its expiry on disk and after promotion
+    ttl_cache = TwoTierLRU_Cache(1, path + '.ttl', 4, ttl=10, clock=lambda: now[0])
+    now[0] = 0
+    ttl_cache.set('a', 1)
+    ttl_cache.set('x', 0)
+    now[0] = 5
+    ttl_cache.set('b', 2)      # 'a' and 'x' spill, still live
+    promoted = ttl_cache.get('x')
+    now[0] = 12
+    passed = (promoted, ttl_cache.get('x'), ttl_cache.get('a'), ttl_cache.get('b')) == (0, -1, -1, 2)
+    test_case('Test 7', passed, True)
+    ttl_cache.close()
+
+    # Test a value that cannot be pickled is dropped rather than failing set()
+    import threading
+    lock_cache = TwoTierLRU_Cache(1, path + '.lock', 2, slot_size=64)
+    lock_cache.set('lock', threading.Lock())
+    lock_cache.set('a', 1)
+    passed = (lock_cache.get('lock'), lock_cache.get('a'), lock_cache.disk.size()) == (-1, 1, 0)
+    test_case('Test 8', passed, True)
+    lock_cache.close()
+
+    print('END TESTS\n')
+    print(our_cache)
+    our_cache.close()
@@ -1,42 +1,79 @@
-
-
 '''
-Recursively appends relevant file paths to array of strings.
+Walks the directory tree iteratively, yielding matching file paths as they are found.
 Complexity: O(n), where n is the number of existing directories and files
+
+os.scandir() returns each entry's type along with its name, so checking whether an
+entry is a file or a directory needs no extra stat call. Directories still to be
+read are kept on an explicit stack of scandir iterators instead of the call stack,
+so deep trees cannot hit the recursion limit, and results are produced in the same
+order as a recursive walk.
 '''
 
-from genericpath import isdir, isfile
 import os
 
 dir_path = os.path.dirname(os.path.realpath(__file__))
-test_dir_path = f'{dir_path}\\testdir'
-
+test_dir_path = os.path.join(dir_path, 'testdir')
 
-def find_files(suffix, path):
 
+def iter_files(suffix, path, traversal_filter=None):
+    '''
+    Generator of paths of files under path whose names end with suffix
+    '''
     if suffix is None or path is None:
-        return []
-
-    # Check path exists
-    if os.path.isdir(path) == False and os.path.isfile(path) == False:
-        return [] 
-
-    directory = os.listdir(path)
-    
-    temp_arr = []
-
-    # Check directory contains anything
-    if len(directory) == 0:
-        return []
-
-    for p in directory:
-        sub_path = os.path.join(path, p)
-        if os.path.isdir(sub_path):
-            temp_arr += find_files(suffix, sub_path) # <---- Recursion here.
-        if os.path.isfile(sub_path) and p.endswith(suffix):
-            temp_arr.append(sub_path) 
-    
-    return temp_arr
+        return
+    for entry in walk_entries(path, traversal_filter):
+        if entry.name.endswith(suffix):
+            yield entry.path
+
+
+def walk_entries(path, traversal_filter=None):
+    '''
+    Generator of os.DirEntry objects for every file under path, depth first.
+    Unreadable directories are skipped.
+    A traversal_filter (see problem_2_filter.py) prunes directories before they
+    are listed and drops files it does not accept.
+    '''
+    if not isinstance(path, (str, bytes, os.PathLike)) or not os.path.isdir(path):
+        return
+
+    visited_links = set()
+    # Each level is [directory iterator, depth, filter rules in scope]
+    rules = traversal_filter.root(path) if traversal_filter is not None else None
+    stack = [(os.scandir(path), 0, rules)]
+    try:
+        while stack:
+            level = stack[-1]
+            entry = next(level[0], None)
+            if entry is None:
+                stack.pop()[0].close()
+                continue
+
+            try:
+                if entry.is_dir():
+                    rules = None
+                    if traversal_filter is not None:
+                        rules = traversal_filter.descend(entry, level[1] + 1, level[2])
+                        if rules is None:
+                            continue
+                    if entry.is_symlink():
+                        # Follow each linked directory once, so link cycles terminate
+                        stat = entry.stat()
+                        if (stat.st_dev, stat.st_ino) in visited_links:
+                            continue
+                        visited_links.add((stat.st_dev, stat.st_ino))
+                    stack.append((os.scandir(entry.path), level[1] + 1, rules))
+                elif entry.is_file():
+                    if traversal_filter is None or traversal_filter.accept(entry, level[2]):
+                        yield entry
+            except OSError:
+                continue
+    finally:
+        for level in stack:
+            level[0].close()
+
+
+def find_files(suffix, path, traversal_filter=None):
+    return list(iter_files(suffix, path, traversal_filter))
 
 
 
@@ -60,45 +97,41 @@ def print_result(file_list):
     print()
 
 
-files = find_files('.c', test_dir_path)
-test_for_suffix('Test 1', '.c')
-print_result(files)
-print()
-
-
-files = find_files('.h', test_dir_path)
-test_for_suffix('Test 2', '.h')
-print_result(files)
-
-# Test null suffix
-files = find_files(None, 123)
-test_for_suffix('Test 3', 123)
-print_result(files)
-
-# Test null path
-files = find_files('.c', None)
-test_for_suffix('Test 4', None)
-print_result(files)
-
-# Test file type without any existing data
-files = find_files('.exe', test_dir_path)
-test_for_suffix('Test 5', '.exe')
-print_result(files)
+if __name__ == '__main__':
+    files = find_files('.c', test_dir_path)
+    test_for_suffix('Test 1', '.c')
+    print_result(files)
+    print()
 
 
-# Test empty string suffix
-# Question: This results in getting all files. 
-# It needs to be determined whether this is expected or an exception
-files = find_files('', test_dir_path)
-test_for_suffix('Test 6', '')
-print_result(files)
+    files = find_files('.h', test_dir_path)
+    test_for_suffix('Test 2', '.h')
+    print_result(files)
 
-# Test empty string path
-files = find_files('.c', '')
-test_for_suffix('Test 7', '')
-print_result(files)
+    # Test null suffix
+    files = find_files(None, 123)
+    test_for_suffix('Test 3', 123)
+    print_result(files)
 
+    # Test null path
+    files = find_files('.c', None)
+    test_for_suffix('Test 4', None)
+    print_result(files)
 
+    # Test file type without any existing data
+    files = find_files('.exe', test_dir_path)
+    test_for_suffix('Test 5', '.exe')
+    print_result(files)
 
 
+    # Test empty string suffix
+    # Question: This results in getting all files. 
+    # It needs to be determined whether this is expected or an exception
+    files = find_files('', test_dir_path)
+    test_for_suffix('Test 6', '')
+    print_result(files)
 
+    # Test empty string path
+    files = find_files('.c', '')
+    test_for_suffix('Test 7', '')
+    print_result(files)
@@ -0,0 +1,91 @@
+'''
+Benchmark for find_files traversal.
+
+Generates a deep/wide test tree (every directory has 'fanout' subdirectories,
+down to 'depth' levels, and 'files' files of mixed suffixes), then times the
+sequential find_files() and find_files_parallel() for each worker count.
+
+Local disks answer directory listings almost instantly, so --listing-delay can
+add a fixed wait to every listing in the parallel walk, to model a network
+filesystem. The 1 worker run is then the sequential baseline.
+
+Usage: python problem_2_benchmark.py [--depth D] [--fanout F] [--files N]
+                                     [--workers 1 2 4 ...] [--listing-delay MS]
+'''
+
+import argparse
+import os
+import tempfile
+import time
+
+from problem_2 import find_files
+from problem_2_parallel import parallel_entries
+
+DEFAULT_WORKERS = [1, 2, 4, 8, 16, 32]
+SUFFIXES = ['.c', '.h', '.py', '.txt']
+
+
+def make_tree(root, depth, fanout, files):
+    '''
+    Returns the number of directories created
+    '''
+    count = 0
+    level = [root]
+    for d in range(depth + 1):
+        next_level = []
+        for directory in level:
+            for i in range(files):
+                with open(os.path.join(directory, f'file{i}{SUFFIXES[i % len(SUFFIXES)]}'), 'w'):
+                    pass
+            if d < depth:
+                for i in range(fanout):
+                    sub = os.path.join(directory, f'dir{i}')
+                    os.mkdir(sub)
+                    next_level.append(sub)
+                    count += 1
+        level = next_level
+    return count
+
+
+def slow_scandir(delay):
+    def scandir(path):
+        time.sleep(delay)
+        return os.scandir(path)
+    return scandir
+
+
+def benchmark(root, worker_counts, delay):
+    '''
+    Returns [(label, seconds, files found)]
+    '''
+    results = []
+
+    if delay == 0:
+        start = time.perf_counter()
+        found = len(find_files('.c', root))
+        results.append(('sequential', time.perf_counter() - start, found))
+
+    scandir = slow_scandir(delay) if delay > 0 else os.scandir
+    for workers in worker_counts:
+        start = time.perf_counter()
+        found = sum(1 for e in parallel_entries(root, workers, scandir) if e.name.endswith('.c'))
+        results.append((f'{workers} workers', time.perf_counter() - start, found))
+
+    for label, seconds, found in results:
+        print(f'{label:>12}: {seconds:8.3f}s ({found} files)')
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--fanout', type=int, default=6)
+    parser.add_argument('--files', type=int, default=8)
+    parser.add_argument('--workers', type=int, nargs='+', default=DEFAULT_WORKERS)
+    parser.add_argument('--listing-delay', type=float, default=0, help='milliseconds')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        directories = make_tree(root, args.depth, args.fanout, args.files)
+        print(f'Tree: {directories + 1} directories, depth {args.depth}, fanout {args.fanout}')
+        benchmark(root, args.workers, args.listing_delay / 1000)
@@ -0,0 +1,277 @@
+'''
+Traversal-time pruning and filtering for find_files.
+
+A TraversalFilter is passed to walk_entries() (and so to find_files(),
+find_files_multi() and parallel_entries()). Directories are checked before they
+are listed, so an excluded subtree is never read at all:
+
+    exclude_dirs    glob patterns matched against directory names,
+                    e.g. ['.git', 'build', '*.egg-info']
+    ignore_file     name of a .gitignore-style rule file. Each directory's rule
+                    file applies to everything below that directory
+    max_depth       levels of subdirectories to descend into; 0 lists only the
+                    files directly in the starting directory
+
+Files are then checked against the ignore rules, and, only when a size or time
+limit is set, their stat results:
+
+    min_size, max_size      bytes, inclusive
+    min_mtime, max_mtime    modification time in seconds since the epoch, inclusive
+
+Ignore rules follow .gitignore: blank lines and '#' comments are skipped, '!'
+re-includes, a trailing '/' matches directories only, a pattern containing '/'
+is relative to the rule file's directory, and otherwise it matches a name at any
+depth. '*', '?' and '[...]' do not match '/', and '**' matches any number of
+directories. The last matching rule wins, with deeper rule files read last.
+Malformed patterns are skipped.
+As in git, a file inside an ignored directory cannot be re-included, since that
+directory is never listed.
+
+Complexity: O(r) per entry for r rules in scope, one open() per directory when
+ignore_file is set, and one stat() per file when a size or time limit is set.
+'''
+
+import fnmatch
+import os
+import re
+from collections import namedtuple
+
+Rule = namedtuple('Rule', 'prefix_length regex negate dir_only anchored')
+
+
+def translate_rule(pattern):
+    '''
+    Compiles one ignore pattern to a regular expression over '/' separated paths
+    '''
+    i, n = 0, len(pattern)
+    parts = []
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == n:
+            parts.append('/.*')
+            i += 3
+        elif c == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif c == '?':
+            parts.append('[^/]')
+            i += 1
+        elif c == '[' and pattern.find(']', i + 2) >= 0:
+            j = pattern.find(']', i + 2)
+            body = pattern[i + 1:j].replace('\\', '\\\\')
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            parts.append(f'[{body}]')
+            i = j + 1
+        elif c == '\\' and i + 1 < n:
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(c))
+            i += 1
+    return re.compile(''.join(parts) + r'\Z')
+
+
+def parse_rules(lines, directory):
+    '''
+    List of Rules from the lines of an ignore file in directory
+    '''
+    prefix_length = len(os.path.join(directory, ''))
+    rules = []
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line.endswith(' ') and not line.endswith('\\ '):
+            line = line.rstrip(' ')
+        if not line or line.startswith('#'):
+            continue
+
+        negate = line.startswith('!')
+        if negate:
+            line = line[1:]
+        elif line.startswith(('\\#', '\\!')):
+            line = line[1:]
+
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        anchored = '/' in line
+        line = line.lstrip('/')
+        if not line:
+            continue
+        try:
+            regex = translate_rule(line)
+        except re.error:
+            # A malformed pattern (e.g. the range [z-a]) is skipped, as git does
+            continue
+        rules.append(Rule(prefix_length, regex, negate, dir_only, anchored))
+    return rules
+
+
+class TraversalFilter(object):
+
+    def __init__(self, exclude_dirs=(), ignore_file=None, max_depth=None,
+                 min_size=None, max_size=None, min_mtime=None, max_mtime=None):
+        self.exclude_dirs = None
+        if exclude_dirs:
+            self.exclude_dirs = re.compile('|'.join(fnmatch.translate(p) for p in exclude_dirs))
+        self.ignore_file = ignore_file
+        self.max_depth = max_depth
+        self.min_size = min_size
+        self.max_size = max_size
+        self.min_mtime = min_mtime
+        self.max_mtime = max_mtime
+        self.needs_stat = any(limit is not None for limit in (min_size, max_size, min_mtime, max_mtime))
+
+    def load_rules(self, directory, rules):
+        '''
+        rules extended with directory's ignore file, if it has one.
+        Tuples are shared by every directory below that adds no rules.
+        '''
+        if self.ignore_file is None:
+            return rules
+        try:
+            with open(os.path.join(directory, self.ignore_file), 'r') as f:
+                added = parse_rules(f, directory)
+        except (OSError, UnicodeDecodeError):
+            return rules
+        return rules + tuple(added) if added else rules
+
+    def root(self, path):
+        '''
+        Rules in scope for the starting directory
+        '''
+        return self.load_rules(path, ())
+
+    def ignored(self, entry, is_dir, rules):
+        ignored = False
+        for rule in rules:
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.anchored:
+                target = entry.path[rule.prefix_length:]
+                if os.sep != '/':
+                    target = target.replace(os.sep, '/')
+            else:
+                target = entry.name
+            if rule.regex.match(target):
+                ignored = not rule.negate
+        return ignored
+
+    def descend(self, entry, depth, rules):
+        '''
+        Rules in scope inside the directory entry at depth, or None to prune it
+        '''
+        if self.max_depth is not None and depth > self.max_depth:
+            return None
+        if self.exclude_dirs is not None and self.exclude_dirs.match(entry.name):
+            return None
+        if rules and self.ignored(entry, True, rules):
+            return None
+        return self.load_rules(entry.path, rules)
+
+    def accept(self, entry, rules):
+        if rules and self.ignored(entry, False, rules):
+            return False
+        if self.needs_stat:
+            stat = entry.stat()
+            if self.min_size is not None and stat.st_size < self.min_size:
+                return False
+            if self.max_size is not None and stat.st_size > self.max_size:
+                return False
+            if self.min_mtime is not None and stat.st_mtime < self.min_mtime:
+                return False
+            if self.max_mtime is not None and stat.st_mtime > self.max_mtime:
+                return False
+        return True
+
+
+if __name__ == '__main__':
+    import shutil
+    import tempfile
+    import time
+
+    from problem_2 import find_files, walk_entries
+    from problem_2_multi import find_files_multi
+    from problem_2_parallel import find_files_parallel
+
+    def make_file(path, data=''):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(data)
+
+    def names(files):
+        return sorted(os.path.relpath(p, tree).replace(os.sep, '/') for p in files)
+
+    class CountingFilter(TraversalFilter):
+        # Records every directory the walk asks to enter
+        def descend(self, entry, depth, rules):
+            asked.append(entry.name)
+            return super().descend(entry, depth, rules)
+
+    print('\nBEGIN TESTS')
+    tree = tempfile.mkdtemp()
+    make_file(os.path.join(tree, 'main.c'), 'x' * 10)
+    make_file(os.path.join(tree, 'main.o'))
+    make_file(os.path.join(tree, 'src', 'util.c'), 'x' * 100)
+    make_file(os.path.join(tree, 'src', 'gen', 'parser.c'))
+    make_file(os.path.join(tree, 'src', 'gen', 'keep.c'))
+    make_file(os.path.join(tree, 'build', 'out.c'))
+    make_file(os.path.join(tree, 'build', 'deep', 'more.c'))
+    make_file(os.path.join(tree, '.git', 'hook.c'))
+    make_file(os.path.join(tree, 'docs', 'build', 'page.c'))
+    make_file(os.path.join(tree, '.gitignore'), '# build output\n*.o\n/build/\n')
+    make_file(os.path.join(tree, 'src', '.gitignore'), 'gen/*\n!gen/keep.c\n')
+
+    # Test excluded directories are pruned before they are listed
+    asked = []
+    found = find_files('.c', tree, CountingFilter(exclude_dirs=['.git', 'build']))
+    passed = (names(found) == ['main.c', 'src/gen/keep.c', 'src/gen/parser.c', 'src/util.c']
+              and 'deep' not in asked)
+    print(f'Test 1 {"Passed" if passed else "Failed"}')
+
+    # Test nested ignore files, anchored and directory-only rules, and '!'
+    found = find_files('', tree, TraversalFilter(exclude_dirs=['.git'], ignore_file='.gitignore'))
+    passed = names(found) == ['.gitignore', 'docs/build/page.c', 'main.c', 'src/.gitignore',
+                              'src/gen/keep.c', 'src/util.c']
+    print(f'Test 2 {"Passed" if passed else "Failed"}')
+
+    # Test max depth, and that nothing deeper is listed
+    asked = []
+    found = find_files('.c', tree, CountingFilter(max_depth=1))
+    passed = names(found) == ['.git/hook.c', 'build/out.c', 'main.c', 'src/util.c'] and 'gen' in asked and 'deep' in asked
+    found = find_files('.c', tree, TraversalFilter(max_depth=0))
+    passed = passed and names(found) == ['main.c']
+    print(f'Test 3 {"Passed" if passed else "Failed"}')
+
+    # Test size and mtime ranges
+    old = time.time() - 3600
+    os.utime(os.path.join(tree, 'src', 'util.c'), (old, old))
+    passed = (names(find_files('.c', tree, TraversalFilter(min_size=1))) == ['main.c', 'src/util.c']
+              and names(find_files('.c', tree, TraversalFilter(min_size=5, max_size=50))) == ['main.c']
+              and names(find_files('.c', tree, TraversalFilter(max_mtime=old + 1))) == ['src/util.c']
+              and 'src/util.c' not in names(find_files('.c', tree, TraversalFilter(min_mtime=old + 1))))
+    print(f'Test 4 {"Passed" if passed else "Failed"}')
+
+    # Test the parallel and multi-pattern walks prune the same way
+    traversal_filter = TraversalFilter(exclude_dirs=['.git'], ignore_file='.gitignore', max_depth=2)
+    expected = names(find_files('.c', tree, traversal_filter))
+    passed = (names(find_files_parallel('.c', tree, 4, traversal_filter=traversal_filter)) == expected
+              and names(find_files_multi(['.c'], tree, traversal_filter)['.c']) == expected)
+    print(f'Test 5 {"Passed" if passed else "Failed"}')
+
+    # Test a malformed rule is skipped and the rest of the file still applies
+    make_file(os.path.join(tree, 'docs', '.gitignore'), '[z-a].c\npage.c\n')
+    traversal_filter = TraversalFilter(exclude_dirs=['.git'], ignore_file='.gitignore')
+    passed = ('docs/build/page.c' not in names(find_files('.c', tree, traversal_filter))
+              and names(find_files_parallel('.c', tree, 4, traversal_filter=traversal_filter))
+              == names(find_files('.c', tree, traversal_filter)) != [])
+    print(f'Test 6 {"Passed" if passed else "Failed"}')
+
+    # Test no filter walks everything, and an empty filter changes nothing
+    passed = list(walk_entries(tree)) and names(find_files('', tree)) == names(find_files('', tree, TraversalFilter()))
+    print(f'Test 7 {"Passed" if passed else "Failed"}')
+
+    print('END TESTS\n')
+    shutil.rmtree(tree)
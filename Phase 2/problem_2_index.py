@@ -0,0 +1,222 @@
+'''
+Persistent file index for repeated suffix queries over the same tree.
+
+The index records, for every directory under the root, its modification time
+and the names of its files and subdirectories, and is saved as JSON.
+
+refresh() walks the directory tree again, but only lists a directory whose
+modification time has changed since the index was saved. Creating, deleting or
+renaming an entry changes its parent directory's mtime, so an unchanged mtime
+means an unchanged listing, and that directory's saved listing is reused. Each
+directory still costs one stat call, but no listing.
+
+A directory modified within the mtime resolution of the refresh could change
+again without its mtime changing, so directories modified in the last
+RACY_SECONDS are always listed again on the next refresh.
+
+Symlinked directories are followed once each, as in problem_2.walk_entries(),
+so link cycles terminate.
+
+Paths are grouped by suffix (the part of the name from its last '.'), so a
+query for a suffix like '.c' is a dictionary lookup. Other suffixes are matched
+against every indexed path.
+
+The root is made absolute, so every path returned is absolute. For a relative
+root this differs from find_files(), whose paths start with the root as given.
+
+Complexity: refresh is O(d + c) for d directories of which c entries changed,
+a '.ext' query is O(m) for m matches, other queries are O(n).
+
+Usage: python problem_2_index.py ROOT SUFFIX [SUFFIX ...] [--index FILE]
+'''
+
+import argparse
+import json
+import os
+import time
+
+RACY_SECONDS = 2
+
+
+def suffix_key(name):
+    dot = name.rfind('.')
+    return name[dot:] if dot >= 0 else ''
+
+
+class FileIndex(object):
+
+    def __init__(self, root, index_path):
+        self.root = os.path.abspath(root)
+        self.index_path = index_path
+        self.directories = {}   # path -> {'mtime': ns or None, 'files': [...], 'subdirs': [...], 'links': [...]}
+        self.by_suffix = None   # suffix -> [paths], built on first query
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('root') == self.root:
+            self.directories = data['directories']
+
+    def save(self):
+        temp_path = f'{self.index_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({'root': self.root, 'directories': self.directories}, f)
+        os.replace(temp_path, self.index_path)
+
+    def list_directory(self, path):
+        files = []
+        subdirs = []
+        links = []      # subdirs that are symlinks
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            subdirs.append(entry.name)
+                            if entry.is_symlink():
+                                links.append(entry.name)
+                        elif entry.is_file():
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return files, subdirs, links
+
+    def refresh(self):
+        '''
+        Brings the index up to date and saves it.
+        Returns (directories listed, directories reused).
+        '''
+        racy_after = time.time_ns() - RACY_SECONDS * 10 ** 9
+        directories = {}
+        listed = reused = 0
+        visited_links = set()
+
+        stack = [(self.root, False)] if os.path.isdir(self.root) else []
+        while stack:
+            path, is_link = stack.pop()
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if is_link:
+                # Follow each linked directory once, so link cycles terminate
+                if (stat.st_dev, stat.st_ino) in visited_links:
+                    continue
+                visited_links.add((stat.st_dev, stat.st_ino))
+            mtime = stat.st_mtime_ns
+
+            saved = self.directories.get(path)
+            if saved is not None and saved['mtime'] == mtime and 'links' in saved:
+                files, subdirs, links = saved['files'], saved['subdirs'], saved['links']
+                reused += 1
+            else:
+                files, subdirs, links = self.list_directory(path)
+                listed += 1
+
+            directories[path] = {
+                'mtime': mtime if mtime < racy_after else None,
+                'files': files,
+                'subdirs': subdirs,
+                'links': links,
+            }
+            links = set(links)
+            for name in reversed(subdirs):
+                stack.append((os.path.join(path, name), name in links))
+
+        self.directories = directories
+        self.by_suffix = None
+        self.save()
+        return listed, reused
+
+    def paths(self):
+        for path, directory in self.directories.items():
+            for name in directory['files']:
+                yield os.path.join(path, name)
+
+    def find(self, suffix):
+        if suffix is None:
+            return []
+        if suffix.startswith('.') and suffix.count('.') == 1:
+            if self.by_suffix is None:
+                self.by_suffix = {}
+                for path in self.paths():
+                    self.by_suffix.setdefault(suffix_key(path), []).append(path)
+            return list(self.by_suffix.get(suffix, []))
+        return [path for path in self.paths() if path.endswith(suffix)]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('root', nargs='?')
+    parser.add_argument('suffixes', nargs='*')
+    parser.add_argument('--index', default='file_index.json')
+    args = parser.parse_args()
+
+    if args.root is not None:
+        start = time.perf_counter()
+        index = FileIndex(args.root, args.index)
+        listed, reused = index.refresh()
+        print(f'Refreshed in {time.perf_counter() - start:.3f}s: {listed} directories listed, {reused} reused')
+        for suffix in args.suffixes:
+            start = time.perf_counter()
+            found = index.find(suffix)
+            print(f'{suffix}: {len(found)} files in {1000 * (time.perf_counter() - start):.2f}ms')
+    else:
+        import shutil
+        import tempfile
+
+        from problem_2 import find_files, test_dir_path
+
+        print('\nBEGIN TESTS')
+        work_dir = tempfile.mkdtemp()
+        tree = os.path.join(work_dir, 'testdir')
+        shutil.copytree(test_dir_path, tree)
+        index_path = os.path.join(work_dir, 'index.json')
+
+        # Test index answers the same as find_files
+        index = FileIndex(tree, index_path)
+        index.refresh()
+        passed = all(sorted(index.find(s)) == sorted(find_files(s, tree)) for s in ['.c', '.h', '', '.exe', 'a.c'])
+        print(f'Test 1 {"Passed" if passed else "Failed"}')
+
+        # Test a reloaded index reuses unchanged directories
+        old = time.time() - 60
+        for path in index.directories:
+            os.utime(path, (old, old))
+        index.refresh()
+        listed, reused = FileIndex(tree, index_path).refresh()
+        passed = (listed, reused) == (0, len(index.directories))
+        print(f'Test 2 {"Passed" if passed else "Failed"}')
+
+        # Test only the changed directory is listed again
+        new_file = os.path.join(tree, 'subdir2', 'new.c')
+        with open(new_file, 'w'):
+            pass
+        index = FileIndex(tree, index_path)
+        listed, reused = index.refresh()
+        passed = listed == 1 and new_file in index.find('.c')
+        print(f'Test 3 {"Passed" if passed else "Failed"}')
+
+        # Test null suffix
+        print(f'Test 4 {"Passed" if index.find(None) == [] else "Failed"}')
+
+        # Test symlinked directories are indexed once, as find_files follows them
+        try:
+            os.symlink(os.path.join(tree, 'subdir1'), os.path.join(tree, 'link'))
+            os.symlink(os.path.join(tree, 'subdir3'), os.path.join(tree, 'subdir3', 'loop'))
+        except (OSError, NotImplementedError):
+            print('Test 5 Skipped (no symlink support)')
+        else:
+            index.refresh()
+            passed = (sorted(index.find('.c')) == sorted(find_files('.c', tree))
+                      and os.path.join(tree, 'link', 'a.c') in index.find('.c'))
+            print(f'Test 5 {"Passed" if passed else "Failed"}')
+
+        print('END TESTS\n')
+        shutil.rmtree(work_dir)
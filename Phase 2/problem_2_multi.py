@@ -0,0 +1,120 @@
+'''
+Find files matching many suffixes and glob patterns in a single walk.
+
+Patterns containing '*', '?' or '[' are globs, matched against the whole file
+name (fnmatch syntax, case sensitive). Every other pattern is a plain suffix,
+as in find_files().
+
+Suffixes are stored reversed in a trie, so one walk backwards over a file name
+from its last character finds every suffix it ends with, whatever the number of
+suffixes. Globs are compiled into one regular expression with a named group per
+glob inside an optional lookahead, so a single match reports every glob the name
+matches.
+
+Results are grouped per pattern, each in walk order. A file matching several
+patterns is listed under each of them.
+
+Complexity: O(n * (l + g)) for n files with names of length l, where g is the
+cost of the combined glob expression (zero if there are no globs).
+'''
+
+import fnmatch
+import re
+
+from problem_2 import test_dir_path, walk_entries
+
+GLOB_CHARACTERS = set('*?[')
+# fnmatch.translate() uses groups named g0, g1, ... on Python 3.10 and older
+GROUP_PREFIX = '_glob'
+
+
+class SuffixTrieNode(object):
+    def __init__(self):
+        self.children = {}
+        self.patterns = []      # suffixes ending at this node
+
+
+class PatternMatcher(object):
+
+    def __init__(self, patterns):
+        self.patterns = list(dict.fromkeys(patterns))
+        self.root = SuffixTrieNode()
+        self.globs = []
+
+        for pattern in self.patterns:
+            if GLOB_CHARACTERS & set(pattern):
+                self.globs.append(pattern)
+            else:
+                self.insert_suffix(pattern)
+
+        self.glob_regex = None
+        if self.globs:
+            self.glob_regex = re.compile(''.join(
+                f'(?:(?=(?P<{GROUP_PREFIX}{i}>{fnmatch.translate(glob)}))|)' for i, glob in enumerate(self.globs)))
+
+    def insert_suffix(self, suffix):
+        node = self.root
+        for c in reversed(suffix):
+            node = node.children.setdefault(c, SuffixTrieNode())
+        node.patterns.append(suffix)
+
+    def matches(self, name):
+        '''
+        List of the patterns that name matches
+        '''
+        found = list(self.root.patterns)
+        node = self.root
+        for c in reversed(name):
+            node = node.children.get(c)
+            if node is None:
+                break
+            found.extend(node.patterns)
+
+        if self.glob_regex is not None:
+            for group, value in self.glob_regex.match(name).groupdict().items():
+                if value is not None and group.startswith(GROUP_PREFIX):
+                    found.append(self.globs[int(group[len(GROUP_PREFIX):])])
+        return found
+
+
+def find_files_multi(patterns, path, traversal_filter=None):
+    '''
+    Returns {pattern: [paths]} for every pattern, in one walk of path
+    '''
+    if patterns is None or path is None:
+        return {}
+    matcher = PatternMatcher(patterns)
+    results = {pattern: [] for pattern in matcher.patterns}
+    for entry in walk_entries(path, traversal_filter):
+        for pattern in matcher.matches(entry.name):
+            results[pattern].append(entry.path)
+    return results
+
+
+if __name__ == '__main__':
+    from problem_2 import find_files
+
+    print('\nBEGIN TESTS')
+
+    # Test each suffix gets the same files as its own find_files walk
+    results = find_files_multi(['.c', '.h', '.exe', '', 'a.c'], test_dir_path)
+    passed = all(results[s] == find_files(s, test_dir_path) for s in results)
+    print(f'Test 1 {"Passed" if passed else "Failed"}')
+
+    # Test globs, and a file listed under every pattern it matches
+    results = find_files_multi(['*.[ch]', 'a.*', '.c'], test_dir_path)
+    passed = (sorted(results['*.[ch]']) == sorted(find_files('.c', test_dir_path) + find_files('.h', test_dir_path))
+              and all(p.endswith(('a.c', 'a.h')) for p in results['a.*'])
+              and len(results['a.*']) == 4)
+    print(f'Test 2 {"Passed" if passed else "Failed"}')
+
+    # Test globs with several '*', whose translations contain their own groups
+    matcher = PatternMatcher(['*a*b', '*a*c*', '*.h'])
+    passed = (matcher.matches('xaxb'), matcher.matches('abc.h')) == (['*a*b'], ['*a*c*', '*.h'])
+    print(f'Test 3 {"Passed" if passed else "Failed"}')
+
+    # Test null patterns and path
+    passed = find_files_multi(None, test_dir_path) == find_files_multi(['.c'], None) == {}
+    print(f'Test 4 {"Passed" if passed else "Failed"}')
+
+    print('END TESTS\n')
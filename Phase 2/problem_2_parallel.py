@@ -0,0 +1,140 @@
+'''
+Parallel directory traversal for find_files.
+
+On network filesystems most of a walk is spent waiting for each directory
+listing to come back. Here a fixed number of worker threads share a queue of
+directories still to be listed: each worker lists one directory, keeps the
+matching files, and puts the subdirectories it finds back on the queue. Up to
+'workers' listings are then in flight at once.
+
+Results come back in whatever order the workers finish, so sort=True is
+available when a deterministic order is needed. The set of paths found is the
+same as find_files() in problem_2.py.
+
+Complexity: O(n) work for n directories and files, spread over the workers,
+plus O(m log m) for m results when sorted.
+'''
+
+import os
+import queue
+import threading
+
+from problem_2 import test_dir_path
+
+DEFAULT_WORKERS = 8
+
+
+def parallel_entries(path, workers=DEFAULT_WORKERS, scandir=os.scandir, traversal_filter=None):
+    '''
+    Returns a list of os.DirEntry objects for every file under path.
+    Unreadable directories are skipped, symlinked directories are followed
+    once each, and traversal_filter is applied, as in problem_2.walk_entries().
+    Any other exception raised while listing a directory is raised again here,
+    once every queued directory has been dealt with.
+    '''
+    if not isinstance(path, (str, bytes, os.PathLike)) or not os.path.isdir(path):
+        return []
+
+    directories = queue.Queue()
+    results = []
+    errors = []
+    visited_links = set()
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            item = directories.get()
+            if item is None:
+                break
+            directory, depth, rules = item
+            found = []
+            try:
+                with scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir():
+                                child_rules = None
+                                if traversal_filter is not None:
+                                    child_rules = traversal_filter.descend(entry, depth + 1, rules)
+                                    if child_rules is None:
+                                        continue
+                                if entry.is_symlink():
+                                    stat = entry.stat()
+                                    with lock:
+                                        if (stat.st_dev, stat.st_ino) in visited_links:
+                                            continue
+                                        visited_links.add((stat.st_dev, stat.st_ino))
+                                directories.put((entry.path, depth + 1, child_rules))
+                            elif entry.is_file():
+                                if traversal_filter is None or traversal_filter.accept(entry, rules):
+                                    found.append(entry)
+                        except OSError:
+                            continue
+            except OSError:
+                pass
+            except Exception as error:
+                # Keep serving the queue, so the walk finishes and the error reaches the caller
+                with lock:
+                    errors.append(error)
+            finally:
+                with lock:
+                    results.extend(found)
+                directories.task_done()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, workers))]
+    for t in threads:
+        t.start()
+
+    rules = traversal_filter.root(path) if traversal_filter is not None else None
+    directories.put((path, 0, rules))
+    directories.join()      # every queued directory has been listed
+    for _ in threads:
+        directories.put(None)
+    for t in threads:
+        t.join()
+
+    if errors:
+        raise errors[0]
+    return results
+
+
+def find_files_parallel(suffix, path, workers=DEFAULT_WORKERS, sort=False, traversal_filter=None):
+    if suffix is None or path is None:
+        return []
+    entries = parallel_entries(path, workers, traversal_filter=traversal_filter)
+    files = [entry.path for entry in entries if entry.name.endswith(suffix)]
+    if sort:
+        files.sort()
+    return files
+
+
+if __name__ == '__main__':
+    from problem_2 import find_files
+
+    print('\nBEGIN TESTS')
+
+    # Test same files as the sequential walk, for each worker count
+    for number, workers in enumerate([1, 2, 8], start=1):
+        passed = all(
+            find_files_parallel(suffix, test_dir_path, workers, sort=True) == sorted(find_files(suffix, test_dir_path))
+            for suffix in ['.c', '.h', '', '.exe'])
+        print(f'Test {number} Passed' if passed else f'Test {number} Failed')
+
+    # Test null arguments and missing path
+    passed = find_files_parallel(None, test_dir_path) == find_files_parallel('.c', None) == find_files_parallel('.c', '') == []
+    print(f'Test 4 {"Passed" if passed else "Failed"}')
+
+    # Test an error while listing is raised, not returned as a partial result
+    def failing_scandir(directory):
+        if directory != test_dir_path:
+            raise ValueError(directory)
+        return os.scandir(directory)
+
+    try:
+        parallel_entries(test_dir_path, 2, failing_scandir)
+        passed = False
+    except ValueError:
+        passed = True
+    print(f'Test 5 {"Passed" if passed else "Failed"}')
+
+    print('END TESTS\n')